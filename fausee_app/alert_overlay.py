@@ -0,0 +1,126 @@
+import queue
+import threading
+
+ALERT_BACKGROUND = "red"
+ALERT_FOREGROUND = "white"
+ALERT_FONT = ("Arial", 50)
+# How often the overlay's Tk loop picks up show/hide requests.
+ALERT_POLL_MS = 50
+
+_SHOW = "show"
+_HIDE = "hide"
+_STOP = "stop"
+
+
+class AlertOverlayService:
+    """
+    Full-screen alert window owned by a dedicated UI thread. The window is built
+    once, on first show(), and then only shown or hidden; callers post requests
+    to a queue and never wait for Tk. show()/hide() only enqueue when the
+    requested state differs from the last one, so calling them every frame is
+    cheap.
+    """
+
+    def __init__(self, logger_manager, poll_ms=ALERT_POLL_MS):
+        self.logger = logger_manager
+        self.poll_ms = poll_ms
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._state = (_HIDE, None)
+        self._failed = False
+        self._shown = 0
+
+    # ----------- Caller side (any thread, never blocks) -----------
+
+    def show(self, text):
+        self._request(_SHOW, text)
+
+    def hide(self):
+        self._request(_HIDE, None)
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._requests.put((_STOP, None))
+            self._thread = None
+            self._state = (_HIDE, None)
+
+    def _request(self, action, text):
+        with self._lock:
+            if self._failed or self._state == (action, text):
+                return
+            self._state = (action, text)
+            if action == _SHOW:
+                self._shown += 1
+            if self._thread is None or not self._thread.is_alive():
+                if action == _HIDE:
+                    return
+                # A fresh queue per UI thread, so a stopping thread cannot eat new requests.
+                self._requests = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._requests,),
+                                                name="alert-overlay", daemon=True)
+                self._thread.start()
+            self._requests.put((action, text))
+
+    def is_visible(self):
+        with self._lock:
+            return self._state[0] == _SHOW
+
+    def stats(self):
+        with self._lock:
+            alive = self._thread is not None and self._thread.is_alive()
+            return {
+                "visible": self._state[0] == _SHOW,
+                "shown": self._shown,
+                "pending": self._requests.qsize() if alive else 0,
+                "ui_thread": alive,
+                "failed": self._failed,
+            }
+
+    # ----------- UI thread -----------
+
+    def _run(self, requests):
+        try:
+            import tkinter as tk
+
+            root = tk.Tk()
+            root.withdraw()
+            root.configure(bg=ALERT_BACKGROUND)
+            label = tk.Label(root, font=ALERT_FONT, fg=ALERT_FOREGROUND, bg=ALERT_BACKGROUND)
+            label.pack(expand=True)
+        except Exception as e:
+            with self._lock:
+                self._failed = True
+                self._state = (_HIDE, None)
+            self.logger.log_event(f"Alert overlay unavailable: {e}", level="error")
+            return
+
+        def drain():
+            action = None
+            try:
+                # Only the newest request matters; older ones are superseded.
+                while True:
+                    action, text = requests.get_nowait()
+                    if action == _STOP:
+                        break
+            except queue.Empty:
+                pass
+            if action == _STOP:
+                root.destroy()
+                return
+            if action == _SHOW:
+                label.config(text=text)
+                root.deiconify()
+                root.attributes('-fullscreen', True)
+                root.attributes('-topmost', True)
+                root.lift()
+            elif action == _HIDE:
+                root.withdraw()
+            root.after(self.poll_ms, drain)
+
+        root.after(0, drain)
+        try:
+            root.mainloop()
+        except Exception as e:
+            self.logger.log_event(f"Alert overlay stopped: {e}", level="error")
@@ -1,3 +1,4 @@
+import multiprocessing
 import threading
 import webbrowser
 import os
@@ -6,11 +7,6 @@ import time
 from logger_manager import LoggerManager
 from db_manager import DBManager
 from log_analyzer import LogAnalyzer
-from face_recognition_manager import FaceRecognitionManager
-from flask_app import app as flask_app
-from gui_app import DashboardApp  # kept for webless/Tk testing if needed
-from controller_api import create_controller_api
-from flask import send_from_directory, render_template_string
 
 USE_ELECTRON = os.environ.get("ELECTRON", "1") != "0"  # default to Electron UI
 
@@ -29,22 +25,56 @@ class MonitorAppController:
         self.logger_manager = LoggerManager()
         self.db_manager = DBManager()
         self.analyzer = LogAnalyzer(self.logger_manager.get_log_dir(), self.db_manager)
-        image_dir = os.path.join(os.getenv('ProgramData') or '.', 'FaceVerificationApp', 'Images')
-        self.face_manager = FaceRecognitionManager(self.logger_manager, image_dir=image_dir)
+        self.image_dir = os.path.join(os.getenv('ProgramData') or '.', 'FaceVerificationApp', 'Images')
 
         self.authenticated = self.db_manager.get_user() is not None
         self.monitoring_active = False
 
         self.recognition_thread = None
         self.log_analyzer_thread = None
+        self.session_listener_thread = None
+
+        # The face manager pulls in cv2, ONNX Runtime, insightface and pywin32, so it is
+        # built in the background while Flask starts serving the UI.
+        self._started_at = time.perf_counter()
+        self._face_manager = None
+        self._face_manager_ready = threading.Event()
+        threading.Thread(target=self._init_face_manager, daemon=True).start()
+
+    def _init_face_manager(self):
+        try:
+            from face_recognition_manager import FaceRecognitionManager
+            self._face_manager = FaceRecognitionManager(self.logger_manager, image_dir=self.image_dir)
+        except Exception as e:
+            self.logger_manager.log_event(f"Failed to initialize face recognition: {e}", level="critical")
+            return
+        finally:
+            self._face_manager_ready.set()
+        self.logger_manager.log_event(
+            f"Face recognition initialized {time.perf_counter() - self._started_at:.2f}s after start."
+        )
 
         self.session_listener_thread = threading.Thread(
-            target=self.face_manager.start_session_event_listener,
+            target=self._face_manager.start_session_event_listener,
             daemon=True
         )
         self.session_listener_thread.start()
         self.logger_manager.log_event("Session event listener started.")
 
+        # Off by default (MODEL_WARMUP_MODE); the mode is normally warmed once it is chosen.
+        self._face_manager.start_model_warmup()
+
+    def face_manager_ready(self):
+        return self._face_manager_ready.is_set() and self._face_manager is not None
+
+    @property
+    def face_manager(self):
+        """Waits for the background initialization on first use."""
+        self._face_manager_ready.wait()
+        if self._face_manager is None:
+            raise RuntimeError("Face recognition failed to initialize; see the log.")
+        return self._face_manager
+
     def refresh_auth_state(self):
         self.authenticated = self.db_manager.get_user() is not None
         return self.authenticated
@@ -65,7 +95,10 @@ class MonitorAppController:
         return self.db_manager.verify_user(username, password)
 
     def update_reference_image(self, parent_window=None):
-        self.face_manager.update_reference_image(parent_window=parent_window)
+        return self.face_manager.update_reference_image(parent_window=parent_window)
+
+    def add_reference_image(self, parent_window=None):
+        return self.face_manager.add_reference_image(parent_window=parent_window)
 
     def bootstrap_reference_embedding(self):
         emb = self.face_manager.ensure_reference_embedding()
@@ -81,9 +114,19 @@ class MonitorAppController:
             try:
                 loop_fn(*args)
             except Exception as e:
+                if self.face_manager.frame_source.exhausted:
+                    # Restarting would acquire() the source again and replay it from the start.
+                    self.logger_manager.log_event(f"Loop crashed after the frame source ran out: {e}.",
+                                                  level="error")
+                    self.monitoring_active = False
+                    return
                 self.logger_manager.log_event(f"Loop crashed: {e}. Restarting in 3s...", level="error")
                 time.sleep(3)
                 continue
+            if self.face_manager.frame_source.exhausted:
+                # Headless replay of a video or image directory: the run is over.
+                self.monitoring_active = False
+                return
             self.logger_manager.log_event("Loop ended unexpectedly. Restarting in 3s...", level="warning")
             time.sleep(3)
 
@@ -101,6 +144,10 @@ class MonitorAppController:
         self.face_manager.pause_recognition.clear()
         self.monitoring_active = True
 
+        # Load and warm only the chosen mode's models, overlapping the reference bootstrap below.
+        from face_models import MODE_PRESENCE, MODE_REFERENCE
+        self.face_manager.start_model_warmup(MODE_REFERENCE if use_reference else MODE_PRESENCE)
+
         if use_reference:
             ref_embed = self.face_manager.ensure_reference_embedding()
             if ref_embed is None:
@@ -115,7 +162,7 @@ class MonitorAppController:
             self.logger_manager.log_event("Monitoring started by user (reference mode)")
             self.recognition_thread = threading.Thread(
                 target=self._loop_with_restart,
-                args=(self.face_manager.recognition_loop, ref_embed),
+                args=(self.face_manager.recognition_loop,),
                 daemon=True
             )
         else:
@@ -133,6 +180,11 @@ class MonitorAppController:
         self.monitoring_active = False
         self.logger_manager.log_event("Monitoring stopped by user")
 
+    def shutdown(self):
+        """Tear down UI resources owned by background threads before the process exits."""
+        if self.face_manager_ready():
+            self._face_manager.alert_overlay.stop()
+
     def start_log_analyzer_loop(self):
         if self.log_analyzer_thread and self.log_analyzer_thread.is_alive():
             self.logger_manager.log_event("Log analyzer thread already running.")
@@ -156,6 +208,12 @@ class MonitorAppController:
 # -------- Flask & App bootstrap --------
 
 def run_flask(controller: MonitorAppController):
+    # Imported here, not at module scope: spawned inference workers re-import this
+    # module, and flask_app opens the database when it is imported.
+    from flask import render_template_string
+    from flask_app import app as flask_app
+    from controller_api import create_controller_api
+
     # Register API blueprint
     api_bp = create_controller_api(controller)
     flask_app.register_blueprint(api_bp)
@@ -199,6 +257,7 @@ def run_flask(controller: MonitorAppController):
     <div class="row">
       <button id="login" class="btn alt">Open Login</button>
       <button id="updateRef" class="btn">Update Reference Image</button>
+      <button id="addRef" class="btn">Add Reference Image</button>
       <button id="startRef" class="btn">Start (You)</button>
       <button id="startPresence" class="btn">Start (Presence)</button>
       <button id="stop" class="btn warn">Stop</button>
@@ -273,6 +332,10 @@ document.getElementById("updateRef").onclick = async () => {
   await fetch("/api/update-ref", {method:"POST"});
   setStatus("Reference image update requested.");
 };
+document.getElementById("addRef").onclick = async () => {
+  await fetch("/api/add-ref", {method:"POST"});
+  setStatus("Additional reference image requested.");
+};
 document.getElementById("startRef").onclick = async () => {
   await fetch("/api/start?mode=reference", {method:"POST"});
   setStatus("Started monitoring (reference mode).");
@@ -308,12 +371,16 @@ def run_app():
     # Start Flask in its own thread if we will still run Tkinter, else run here synchronously
     if USE_ELECTRON:
         # Electron will open /ui; run Flask on main thread
-        run_flask(controller)
+        try:
+            run_flask(controller)
+        finally:
+            controller.shutdown()
     else:
         # Legacy Tkinter mode (debug/testing) – Flask on background thread + Tk dashboard
         flask_thread = threading.Thread(target=run_flask, args=(controller,), daemon=True)
         flask_thread.start()
 
+        from gui_app import DashboardApp  # Tk is only loaded for the legacy dashboard
         app = DashboardApp(controller)
         try:
             app.mainloop()
@@ -322,6 +389,10 @@ def run_app():
                 controller.stop_recognition()
                 controller.logger_manager.log_event("Monitoring stopped by user (Keyboard interrupt).")
             controller.logger_manager.stop_session()
+        finally:
+            controller.shutdown()
 
 if __name__ == "__main__":
+    # The inference worker is a spawned process; needed for frozen Windows builds.
+    multiprocessing.freeze_support()
     run_app()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Recognition throughput: one session run per face vs. one batched run for all faces.
+
+    python benchmarks/bench_batch_recognition.py --images path/to/face_images --batches 1 2 4 8
+
+Aligned crops are taken from the images (first face of each) and repeated to
+fill each batch size. Reports ms per batch and ms per face for both paths, and
+the largest embedding difference between them.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_models import FaceModels, MODE_REFERENCE, MODEL_PACK  # noqa: E402
+from model_quantization import aligned_faces, list_images  # noqa: E402
+
+
+class _PrintLogger:
+    def log_event(self, message, level="info"):
+        print(f"[{level}] {message}")
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--pack", default=MODEL_PACK)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    models = FaceModels(_PrintLogger(), pack=args.pack)
+    models.ensure_mode(MODE_REFERENCE)
+    images = [img for img in (cv2.imread(p) for p in list_images(args.images)) if img is not None]
+    crops = aligned_faces(images, models.det_model)
+    if not crops:
+        sys.exit("No faces found in the images.")
+
+    print(f"{'batch':>6}{'single ms':>11}{'batched ms':>12}{'single/face':>13}{'batched/face':>14}{'max diff':>10}")
+    for size in args.batches:
+        batch = [crops[i % len(crops)] for i in range(size)]
+
+        def single():
+            feats = np.vstack([models.rec_model.get_feat(crop) for crop in batch])
+            return feats / np.linalg.norm(feats, axis=1, keepdims=True)
+
+        single_ms, single_out = timed(single, args.repeat)
+        batched_ms, batched_out = timed(lambda: models.embed_crops(batch), args.repeat)
+        diff = float(np.abs(single_out - batched_out).max())
+        print(f"{size:>6}{single_ms:>11.2f}{batched_ms:>12.2f}{single_ms / size:>13.2f}"
+              f"{batched_ms / size:>14.2f}{diff:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+1:N embedding index benchmark: exact vs. IVF over growing gallery sizes.
+
+    python benchmarks/bench_index.py
+    python benchmarks/bench_index.py --sizes 10 1000 100000 --nprobe 4 8 16
+
+Galleries are synthetic unit vectors; queries are noisy copies of enrolled rows,
+as a new camera capture of an enrolled employee would be. Recall@1 is measured
+against the exact index.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_index import EmbeddingIndex, INDEX_MODE_EXACT, INDEX_MODE_IVF, EMBEDDING_DIM  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def make_queries(rng, gallery, count, noise):
+    picks = rng.integers(0, gallery.shape[0], size=count)
+    queries = gallery[picks] + noise * rng.standard_normal((count, gallery.shape[1])).astype(np.float32)
+    return queries, picks
+
+
+def time_queries(index, queries, nprobe=None):
+    latencies = []
+    labels = []
+    for q in queries:
+        start = time.perf_counter()
+        _, lab = index.search(q[None, :], k=1, nprobe=nprobe)
+        latencies.append(time.perf_counter() - start)
+        labels.append(lab[0, 0] if lab.shape[1] else "")
+    latencies = np.array(latencies) * 1000
+    return float(np.mean(latencies)), float(np.percentile(latencies, 95)), np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.03, help="Per-dimension query noise (std)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'size':>8} {'index':<16} {'build s':>8} {'mean ms':>8} {'p95 ms':>8} {'recall@1':>9} {'memory MB':>10}")
+    for size in args.sizes:
+        gallery = rng.standard_normal((size, EMBEDDING_DIM)).astype(np.float32)
+        labels = np.array([f"emp{i}" for i in range(size)])
+        queries, _ = make_queries(rng, gallery, args.queries, args.noise)
+
+        exact = EmbeddingIndex(mode=INDEX_MODE_EXACT)
+        start = time.perf_counter()
+        exact.build(gallery, labels)
+        build_s = time.perf_counter() - start
+        mean_ms, p95_ms, truth = time_queries(exact, queries)
+        print(f"{size:>8} {'exact':<16} {build_s:>8.2f} {mean_ms:>8.3f} {p95_ms:>8.3f} {1.0:>9.3f} "
+              f"{exact.memory_bytes() / 2**20:>10.1f}")
+
+        ivf = EmbeddingIndex(mode=INDEX_MODE_IVF, seed=args.seed)
+        start = time.perf_counter()
+        ivf.build(gallery, labels)
+        build_s = time.perf_counter() - start
+        for nprobe in args.nprobe:
+            mean_ms, p95_ms, found = time_queries(ivf, queries, nprobe=nprobe)
+            recall = float((found == truth).mean())
+            name = f"ivf nprobe={nprobe}" if ivf.is_trained else "ivf (too small)"
+            print(f"{size:>8} {name:<16} {build_s:>8.2f} {mean_ms:>8.3f} {p95_ms:>8.3f} {recall:>9.3f} "
+                  f"{ivf.memory_bytes() / 2**20:>10.1f}")
+            if not ivf.is_trained:
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+fp32 vs. INT8 comparison for the detector and recognizer of a buffalo pack.
+
+    python model_quantization.py --method dynamic          # build variants first
+    python benchmarks/bench_quantization.py --images path/to/face_images
+
+For every precision variant present on disk it reports, per model:
+  - file size and resident memory added by creating the session (needs psutil),
+  - mean / p95 latency per inference,
+  - drift against fp32 on the same inputs: detector top-box IoU and score delta,
+    recognizer embedding cosine and the change in pairwise similarity between
+    images (what the SIMILARITY_THRESHOLD decision actually sees).
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import onnxruntime
+from insightface.model_zoo import ArcFaceONNX, RetinaFace
+from insightface.utils import ensure_available
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_models import (DET_SIZE, MODEL_PACK, MODEL_ROOT, PRECISION_FP32, PRECISION_INT8_DYNAMIC,  # noqa: E402
+                         PRECISION_INT8_STATIC, TASK_FILE_PATTERNS, variant_path)
+from face_tracker import iou  # noqa: E402
+from model_quantization import aligned_faces, list_images  # noqa: E402
+from runtime_tuning import build_session_options  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PRECISIONS = [PRECISION_FP32, PRECISION_INT8_DYNAMIC, PRECISION_INT8_STATIC]
+
+
+def rss_mb():
+    return psutil.Process().memory_info().rss / 2**20 if psutil else float("nan")
+
+
+def load(task, model_file):
+    before = rss_mb()
+    session = onnxruntime.InferenceSession(model_file, sess_options=build_session_options(),
+                                           providers=["CPUExecutionProvider"])
+    if task == "detection":
+        model = RetinaFace(model_file=model_file, session=session)
+        model.prepare(0, input_size=DET_SIZE)
+    else:
+        model = ArcFaceONNX(model_file=model_file, session=session)
+        model.prepare(0)
+    return model, rss_mb() - before
+
+
+def timed(fn, inputs, repeat):
+    outputs = [fn(x) for x in inputs]  # warm-up pass doubles as the drift sample
+    latencies = []
+    for _ in range(repeat):
+        for x in inputs:
+            start = time.perf_counter()
+            fn(x)
+            latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return outputs, float(latencies.mean()), float(np.percentile(latencies, 95))
+
+
+def detection_drift(reference, outputs):
+    ious, score_deltas, count_mismatch = [], [], 0
+    for (ref_boxes, _), (boxes, _) in zip(reference, outputs):
+        count_mismatch += int(ref_boxes.shape[0] != boxes.shape[0])
+        if ref_boxes.shape[0] and boxes.shape[0]:
+            ious.append(iou(ref_boxes[0, :4], boxes[0, :4]))
+            score_deltas.append(abs(float(ref_boxes[0, 4] - boxes[0, 4])))
+    return (f"top-box IoU mean {np.mean(ious) if ious else float('nan'):.3f}, "
+            f"score delta mean {np.mean(score_deltas) if score_deltas else float('nan'):.4f}, "
+            f"face-count mismatches {count_mismatch}/{len(reference)}")
+
+
+def normalize(embeddings):
+    embeddings = np.vstack(embeddings)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def recognition_drift(reference, outputs):
+    ref = normalize(reference)
+    cur = normalize(outputs)
+    cosine = (ref * cur).sum(axis=1)
+    pair_delta = np.abs(ref @ ref.T - cur @ cur.T)
+    return (f"cosine to fp32 mean {cosine.mean():.4f} min {cosine.min():.4f}, "
+            f"pairwise similarity delta mean {pair_delta.mean():.4f} max {pair_delta.max():.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="Fixed set of face images")
+    parser.add_argument("--pack", default=MODEL_PACK)
+    parser.add_argument("--root", default=MODEL_ROOT)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    images = [img for img in (cv2.imread(p) for p in list_images(args.images)) if img is not None]
+    if not images:
+        sys.exit("No readable images.")
+    model_dir = ensure_available('models', args.pack, root=args.root)
+
+    base_files = {task: sorted(glob.glob(os.path.join(model_dir, pattern)))[0]
+                  for task, pattern in TASK_FILE_PATTERNS.items()}
+
+    fp32_det, _ = load("detection", base_files["detection"])
+    crops = aligned_faces(images, fp32_det)
+    inputs = {
+        "detection": (images, lambda model, img: model.detect(img, max_num=0, metric='default')),
+        "recognition": (crops, lambda model, crop: model.get_feat(crop).flatten()),
+    }
+    drift_fns = {"detection": detection_drift, "recognition": recognition_drift}
+    print(f"{len(images)} images, {len(crops)} aligned faces, {args.repeat} timed passes\n")
+
+    for task, base_file in base_files.items():
+        task_inputs, run = inputs[task]
+        if not task_inputs:
+            print(f"{task}: no inputs, skipped")
+            continue
+        reference = None
+        print(f"{task} ({os.path.basename(base_file)})")
+        print(f"  {'precision':<14}{'file MB':>8}{'RSS +MB':>9}{'mean ms':>9}{'p95 ms':>8}  drift vs fp32")
+        for precision in PRECISIONS:
+            model_file = variant_path(base_file, precision)
+            if not os.path.exists(model_file):
+                continue
+            model, rss = load(task, model_file)
+            outputs, mean_ms, p95_ms = timed(lambda x: run(model, x), task_inputs, args.repeat)
+            if reference is None:
+                reference = outputs
+                drift = "-"
+            else:
+                drift = drift_fns[task](reference, outputs)
+            size_mb = os.path.getsize(model_file) / 2**20
+            print(f"  {precision:<14}{size_mb:>8.1f}{rss:>9.1f}{mean_ms:>9.2f}{p95_ms:>8.2f}  {drift}")
+            del model
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Startup benchmark: what `import app` pulls in, and how long until the UI answers.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --skip-server
+
+1. Runs `python -X importtime -c "import app"` in a fresh interpreter and reports
+   the total import time, the slowest of app's direct imports, and any
+   HEAVY_MODULES that were imported (none should be: the face manager loads
+   them in the background, and Flask when the server starts).
+2. Starts `python app.py` in Electron mode and measures the wall-clock time
+   until GET /api/status answers, which is what the Electron shell waits for.
+
+Each step runs --runs times and the median is compared to its budget. Exits
+with status 1 if a budget is exceeded or a heavy module is imported eagerly,
+so it can guard startup in CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATUS_URL = "http://127.0.0.1:5000/api/status"
+
+IMPORT_BUDGET_MS = 1500
+STATUS_BUDGET_S = 3.0
+STATUS_TIMEOUT_S = 60.0
+# Must not be imported by `import app`; they belong to the code paths that need them.
+# flask_app also opens the database, which spawned inference workers must not do.
+HEAVY_MODULES = ("cv2", "onnxruntime", "insightface", "tkinter", "PIL", "win32gui", "gui_app",
+                 "face_recognition_manager", "flask_app")
+
+
+def import_profile():
+    """(total ms, [(cumulative ms, module imported directly by app)], set of imported modules) for `import app`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=APP_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"`import app` failed:\n{result.stderr[-2000:]}")
+    entries = []  # (depth, cumulative ms, name) in completion order: children precede their parent
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name_field = line[len("import time:"):].split("|")
+        # importtime indents nested imports by two spaces per level.
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        entries.append((depth, int(cumulative) / 1000, name_field.strip()))
+    modules = {name for _, _, name in entries}
+
+    app_index = next(i for i, (depth, _, name) in enumerate(entries) if depth == 0 and name == "app")
+    direct = []
+    for depth, ms, name in reversed(entries[:app_index]):
+        if depth == 0:
+            break  # reached the previous top-level import, e.g. site
+        if depth == 1:
+            direct.append((ms, name))
+    return entries[app_index][1], sorted(direct, reverse=True), modules
+
+
+def status_latency():
+    """Seconds from launching app.py until /api/status answers."""
+    env = dict(os.environ, ELECTRON="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "app.py"], cwd=APP_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < STATUS_TIMEOUT_S:
+            if proc.poll() is not None:
+                sys.exit(f"app.py exited with status {proc.returncode} before answering.")
+            try:
+                with urllib.request.urlopen(STATUS_URL, timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.05)
+        sys.exit(f"/api/status did not answer within {STATUS_TIMEOUT_S:.0f}s.")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def server_running():
+    try:
+        with urllib.request.urlopen(STATUS_URL, timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--status-budget-s", type=float, default=STATUS_BUDGET_S)
+    parser.add_argument("--skip-server", action="store_true", help="only profile `import app`")
+    args = parser.parse_args()
+
+    failures = []
+
+    totals = []
+    for _ in range(args.runs):
+        total_ms, direct, modules = import_profile()
+        totals.append(total_ms)
+    import_ms = statistics.median(totals)
+    print(f"import app: {import_ms:.0f} ms median over {args.runs} run(s) (budget {args.import_budget_ms:.0f} ms)")
+    for ms, name in direct[:args.top]:
+        print(f"  {ms:>9.1f} ms  {name}")
+    eager = sorted(m for m in HEAVY_MODULES if m in modules)
+    if eager:
+        failures.append(f"heavy modules imported by `import app`: {', '.join(eager)}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.0f} ms over budget")
+
+    if not args.skip_server:
+        if server_running():
+            sys.exit(f"Something already answers on {STATUS_URL}; stop it first.")
+        latencies = [status_latency() for _ in range(args.runs)]
+        status_s = statistics.median(latencies)
+        print(f"first /api/status: {status_s:.2f} s median over {args.runs} run(s) "
+              f"(budget {args.status_budget_s:.2f} s)")
+        if status_s > args.status_budget_s:
+            failures.append(f"time to /api/status {status_s:.2f} s over budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import cv2
+import sys
+import time
+
+from frame_sources import FrameSource
+
+CAMERA_DEVICE_INDEX = 0
+CAMERA_BACKEND = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_ANY
+CAMERA_BUFFER_SIZE = 3
+CAMERA_FAILURE_THRESHOLD = 10
+CAMERA_REOPEN_DELAY = 5
+CAMERA_READ_FAILURE_DELAY = 0.05
+# Formats tried in order at the requested frame size until the device accepts one:
+# (FOURCC, fps). MJPG avoids USB bandwidth limits at the larger sizes; a None field
+# leaves that property at the driver default.
+CAMERA_FORMATS = [
+    ("MJPG", 15),
+    ("YUY2", 15),
+    (None, None),
+]
+# Size asked for until a consumer requests another, e.g. the watch loop's working size.
+CAMERA_FRAME_SIZE = (640, 480)
+# Frames are only decoded (retrieve) while someone asked for one within this window;
+# otherwise they are grabbed and dropped so the driver queue never goes stale.
+CAMERA_DEMAND_HOLD = 0.5
+
+
+class CameraCaptureService(FrameSource):
+    """
+    Owns the camera device for as long as anyone holds it and keeps the most
+    recent frames in a small ring buffer. Consumers pull frames instead of
+    opening their own cv2.VideoCapture.
+    """
+
+    name = "camera"
+
+    def __init__(self, logger_manager, device_index=CAMERA_DEVICE_INDEX, backend=CAMERA_BACKEND,
+                 buffer_size=CAMERA_BUFFER_SIZE, failure_threshold=CAMERA_FAILURE_THRESHOLD,
+                 formats=None, demand_hold=CAMERA_DEMAND_HOLD, metrics=None):
+        super().__init__(logger_manager, buffer_size=buffer_size, demand_hold=demand_hold, metrics=metrics)
+        self.device_index = device_index
+        self.backend = backend
+        self.failure_threshold = failure_threshold
+        self.formats = formats or CAMERA_FORMATS
+        self.negotiated_format = None
+        self._requested_size = CAMERA_FRAME_SIZE
+        self._negotiated_size = None
+
+        self._consecutive_failures = 0
+        self.total_reads = 0
+        self.total_failures = 0
+        self.total_skipped = 0
+
+    def describe(self):
+        return f"camera {self.device_index}"
+
+    # LogAnalyzer derives camera downtime from these two exact messages.
+    def _down_message(self):
+        return "Camera inaccessible"
+
+    def _up_message(self):
+        return "Camera accessible again"
+
+    def stats(self):
+        return dict(super().stats(), **{
+            "format": self.negotiated_format,
+            "reads": self.total_reads,
+            "skipped": self.total_skipped,
+            "failures": self.total_failures,
+        })
+
+    def request_frame_size(self, size):
+        """Capture at `size` from now on; the capture thread renegotiates before its next grab."""
+        self._requested_size = tuple(size)
+
+    # ----------- Capture thread -----------
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.device_index, self.backend)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        self._negotiate(cap)
+        return cap
+
+    @staticmethod
+    def _fourcc_name(cap):
+        code = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ") or None
+
+    def _negotiate(self, cap):
+        """
+        Ask for the requested size with the first entry of `formats` the device
+        honours. A device that cannot deliver the size records what it does
+        deliver in max_frame_size, so consumers stop asking for more.
+        """
+        size = self._requested_size
+        self._negotiated_size = size
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        # With no formats configured, report whatever the driver settled on.
+        actual_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        actual_fourcc = self._fourcc_name(cap)
+        for fourcc, fps in self.formats:
+            if fourcc:
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+            if fps:
+                cap.set(cv2.CAP_PROP_FPS, fps)
+
+            actual_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            actual_fourcc = self._fourcc_name(cap)
+            if actual_size != size:
+                continue
+            if fourcc and actual_fourcc and actual_fourcc != fourcc:
+                continue
+            break
+
+        if actual_size[0] < size[0] or actual_size[1] < size[1]:
+            self.max_frame_size = actual_size
+
+        negotiated = {
+            "fourcc": actual_fourcc,
+            "size": list(actual_size),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+        }
+        if negotiated != self.negotiated_format:
+            self.logger.log_event(
+                f"Camera format: {actual_fourcc or 'default'} {actual_size[0]}x{actual_size[1]} "
+                f"@ {negotiated['fps']:.0f} fps."
+            )
+        self.negotiated_format = negotiated
+
+    def _run(self):
+        cap = None
+        try:
+            while not self._stop.is_set():
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        with self._cond:
+                            self._set_healthy(False)
+                        self._stop.wait(CAMERA_REOPEN_DELAY)
+                        continue
+                    self._consecutive_failures = 0
+                elif self._requested_size != self._negotiated_size:
+                    self._negotiate(cap)
+
+                # grab() only dequeues the buffer; decoding happens in retrieve(),
+                # which is skipped while nobody wants frames.
+                started = time.perf_counter()
+                ret = cap.grab()
+                frame = None
+                if ret:
+                    if not self._wants_frame():
+                        self.total_skipped += 1
+                        self._consecutive_failures = 0
+                        if not self._healthy:
+                            with self._cond:
+                                self._set_healthy(True)
+                                self._cond.notify_all()
+                        continue
+                    ret, frame = cap.retrieve()
+                self.total_reads += 1
+                if not ret or frame is None:
+                    self.total_failures += 1
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures >= self.failure_threshold:
+                        # Device stopped delivering frames; only now is it worth reopening.
+                        with self._cond:
+                            self._set_healthy(False)
+                            self._cond.notify_all()
+                        cap.release()
+                        cap = None
+                        self._stop.wait(CAMERA_REOPEN_DELAY)
+                    else:
+                        time.sleep(CAMERA_READ_FAILURE_DELAY)
+                    continue
+
+                self._consecutive_failures = 0
+                self._observe_capture(started)
+                self._publish(frame)
+        finally:
+            if cap is not None:
+                cap.release()
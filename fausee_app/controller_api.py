@@ -1,6 +1,9 @@
 # controller_api.py
-from flask import Blueprint, jsonify, request
+import os
+
+from flask import Blueprint, Response, jsonify, request
 from flask_cors import CORS
+from werkzeug.utils import secure_filename
 
 def create_controller_api(controller):
     api = Blueprint("controller_api", __name__)
@@ -11,12 +14,36 @@ def create_controller_api(controller):
     @api.get("/api/status")
     def status():
         auth = controller.refresh_auth_state()
-        mon = controller.monitoring_active and not controller.face_manager.pause_recognition.is_set()
+        if not controller.face_manager_ready():
+            # Face recognition is still loading in the background; answer without waiting for it.
+            return jsonify({"authenticated": auth, "monitoring": controller.monitoring_active, "ready": False})
+        fm = controller.face_manager
+        mon = controller.monitoring_active and not fm.pause_recognition.is_set()
         return jsonify({
             "authenticated": auth,
-            "monitoring": mon
+            "monitoring": mon,
+            "ready": True,
+            "frame_gate": fm.frame_gate.stats(),
+            "scheduler": fm.scheduler.stats(),
+            "roi": fm.roi_detector.stats(),
+            "resolution": fm.resolution.stats(),
+            "camera": fm.frame_source.stats(),
+            "pipeline": fm.pipeline.stats() if fm.pipeline else None,
+            "decision": fm.decision_policy.stats() if fm.decision_policy else None,
+            "alert": fm.alert_overlay.stats()
         })
 
+    @api.get("/api/metrics")
+    def metrics():
+        """Hot-path latency histograms and counters; Prometheus text by default, ?format=json for JSON."""
+        if not controller.face_manager_ready():
+            # Never block on (or crash with) the background face-manager init.
+            return jsonify({"ready": False}), 503
+        registry = controller.face_manager.metrics
+        if request.args.get("format") == "json":
+            return jsonify(registry.to_json())
+        return Response(registry.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
     @api.post("/api/start")
     def start():
         mode = request.args.get("mode", "reference")  # "reference" or "presence"
@@ -32,8 +59,55 @@ def create_controller_api(controller):
     @api.post("/api/update-ref")
     def update_ref():
         # No parent window in headless mode; FaceRecognitionManager handles camera dialog itself
-        controller.update_reference_image(parent_window=None)
-        return jsonify({"ok": True})
+        return jsonify({"ok": bool(controller.update_reference_image(parent_window=None))})
+
+    @api.post("/api/add-ref")
+    def add_ref():
+        # Adds an enrollment image; a running reference loop picks it up on the next frame
+        return jsonify({"ok": bool(controller.add_reference_image(parent_window=None))})
+
+    # ----------- 1:N identities (shared workstations) -----------
+
+    @api.post("/api/identities")
+    def enroll_identity():
+        """Multipart form: `label` and an `image` file with that person's face."""
+        if not controller.refresh_auth_state():
+            return jsonify({"ok": False, "error": "not authenticated"}), 401
+        if not controller.face_manager_ready():
+            return jsonify({"ok": False, "ready": False}), 503
+        label = secure_filename(request.form.get("label", ""))
+        image = request.files.get("image")
+        if not label or image is None:
+            return jsonify({"ok": False, "error": "label and image are required"}), 400
+        fm = controller.face_manager
+        path = fm.identity_image_path(label)
+        image.save(path)
+        if not fm.enroll_identity(label, path):
+            os.remove(path)
+            return jsonify({"ok": False, "error": "no face found in image"}), 422
+        return jsonify({"ok": True, "label": label})
+
+    @api.delete("/api/identities/<label>")
+    def remove_identity(label):
+        if not controller.refresh_auth_state():
+            return jsonify({"ok": False, "error": "not authenticated"}), 401
+        if not controller.face_manager_ready():
+            return jsonify({"ok": False, "ready": False}), 503
+        removed = controller.face_manager.remove_identity(secure_filename(label))
+        return jsonify({"ok": bool(removed), "removed": removed})
+
+    @api.post("/api/identify")
+    def identify():
+        """Identify every face in the current camera frame against the enrolled identities."""
+        if not controller.refresh_auth_state():
+            return jsonify({"ok": False, "error": "not authenticated"}), 401
+        if not controller.face_manager_ready():
+            return jsonify({"ok": False, "ready": False}), 503
+        results = controller.face_manager.identify_current_frame(k=int(request.args.get("k", 1)))
+        if results is None:
+            return jsonify({"ok": False, "error": "camera not available"}), 503
+        return jsonify({"ok": True, "faces": [{"label": label, "similarity": similarity}
+                                             for label, similarity in results]})
 
     @api.get("/api/stats")
     def stats():
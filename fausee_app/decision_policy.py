@@ -0,0 +1,188 @@
+import math
+import threading
+import time
+
+DECISION_UNDECIDED = "undecided"
+DECISION_PRESENT = "present"
+DECISION_ABSENT = "absent"
+
+DECISION_POLICY = "sprt"  # "sprt" | "ema"
+# Never lock sooner than this after the first miss, whatever the evidence...
+ABSENCE_MIN_SECONDS = 5.0
+# ...and always lock once misses have lasted this long without a present decision.
+ABSENCE_DEADLINE_SECONDS = 60.0
+
+# SPRT error targets: wrongly locking a present user / missing an absent one.
+SPRT_FALSE_LOCK_RATE = 0.01
+SPRT_MISSED_ABSENCE_RATE = 0.01
+# Similarity to the reference gallery, modelled as a Gaussian per hypothesis. Keep
+# the midpoint at SIMILARITY_THRESHOLD so a score below it is evidence of absence.
+SPRT_PRESENT_SIMILARITY = 0.7
+SPRT_ABSENT_SIMILARITY = 0.3
+SPRT_SIMILARITY_STD = 0.12
+# Probability that a sample finds a face (or matches, without a score) per hypothesis.
+SPRT_FACE_RATE_PRESENT = 0.85
+SPRT_FACE_RATE_ABSENT = 0.1
+
+# EMA of the per-sample absence score (1 = miss, 0 = match).
+EMA_SMOOTHING = 0.3
+EMA_ABSENT_LEVEL = 0.8
+EMA_PRESENT_LEVEL = 0.2
+
+
+class DecisionPolicy:
+    """
+    Turns per-frame outcomes into present/absent decisions. Subclasses weigh the
+    evidence; the base class applies the wall-clock bounds so the time to lock
+    stays between `min_seconds` and `deadline_seconds` after the first miss,
+    however fast frames arrive.
+    """
+
+    name = None
+
+    def __init__(self, min_seconds=ABSENCE_MIN_SECONDS, deadline_seconds=ABSENCE_DEADLINE_SECONDS):
+        self.min_seconds = min_seconds
+        self.deadline_seconds = deadline_seconds
+        self._lock = threading.Lock()
+        self._streak_start = None
+        self._samples = 0
+        self._decisions = {DECISION_PRESENT: 0, DECISION_ABSENT: 0}
+
+    def _evidence(self, found, similarity):
+        """Update internal state with one sample; return a DECISION_* constant."""
+        raise NotImplementedError
+
+    def _reset_evidence(self):
+        raise NotImplementedError
+
+    def observe(self, found, similarity=None, now=None):
+        """
+        Feed one sample: `found` is the frame-level outcome, `similarity` the best
+        gallery score when recognition ran. Returns a DECISION_* constant.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples += 1
+            evidence = self._evidence(found, similarity)
+            if evidence == DECISION_PRESENT:
+                self._streak_start = None
+                self._reset_evidence()
+                self._decisions[DECISION_PRESENT] += 1
+                return DECISION_PRESENT
+
+            if found:
+                # A matched frame never locks: it ends the miss streak, so the
+                # deadline restarts from the next miss.
+                self._streak_start = None
+                return DECISION_UNDECIDED
+            if self._streak_start is None:
+                self._streak_start = now
+            elapsed = now - self._streak_start
+            if elapsed >= self.deadline_seconds or (evidence == DECISION_ABSENT and elapsed >= self.min_seconds):
+                self._decisions[DECISION_ABSENT] += 1
+                return DECISION_ABSENT
+            return DECISION_UNDECIDED
+
+    def reset(self):
+        with self._lock:
+            self._streak_start = None
+            self._reset_evidence()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "policy": self.name,
+                "samples": self._samples,
+                "decisions": dict(self._decisions),
+                "absent_for": None if self._streak_start is None else time.monotonic() - self._streak_start,
+            }
+
+
+class SprtPolicy(DecisionPolicy):
+    """
+    Wald's sequential probability ratio test between "user present" and "user
+    absent". Each sample adds its log-likelihood ratio; the test stops as soon
+    as either error target is met, so clear evidence needs only a few frames.
+    """
+
+    name = "sprt"
+
+    def __init__(self, false_lock_rate=SPRT_FALSE_LOCK_RATE, missed_absence_rate=SPRT_MISSED_ABSENCE_RATE,
+                 present_similarity=SPRT_PRESENT_SIMILARITY, absent_similarity=SPRT_ABSENT_SIMILARITY,
+                 similarity_std=SPRT_SIMILARITY_STD, face_rate_present=SPRT_FACE_RATE_PRESENT,
+                 face_rate_absent=SPRT_FACE_RATE_ABSENT, **kwargs):
+        super().__init__(**kwargs)
+        self.absent_bound = math.log((1 - missed_absence_rate) / false_lock_rate)
+        self.present_bound = math.log(missed_absence_rate / (1 - false_lock_rate))
+        self.present_similarity = present_similarity
+        self.absent_similarity = absent_similarity
+        self.similarity_var = similarity_std ** 2
+        self.found_llr = math.log(face_rate_absent / face_rate_present)
+        self.missed_llr = math.log((1 - face_rate_absent) / (1 - face_rate_present))
+        self._llr = 0.0
+
+    def _evidence(self, found, similarity):
+        if similarity is not None:
+            self._llr += ((similarity - self.present_similarity) ** 2
+                          - (similarity - self.absent_similarity) ** 2) / (2 * self.similarity_var)
+        else:
+            self._llr += self.found_llr if found else self.missed_llr
+        if self._llr >= self.absent_bound:
+            # Hold at the bound so one good frame can still flip the decision.
+            self._llr = self.absent_bound
+            return DECISION_ABSENT
+        if self._llr <= self.present_bound:
+            return DECISION_PRESENT
+        return DECISION_UNDECIDED
+
+    def _reset_evidence(self):
+        self._llr = 0.0
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["llr"] = self._llr
+        return stats
+
+
+class EmaPolicy(DecisionPolicy):
+    """Exponential moving average of misses, with separate present/absent levels."""
+
+    name = "ema"
+
+    def __init__(self, smoothing=EMA_SMOOTHING, absent_level=EMA_ABSENT_LEVEL,
+                 present_level=EMA_PRESENT_LEVEL, **kwargs):
+        super().__init__(**kwargs)
+        self.smoothing = smoothing
+        self.absent_level = absent_level
+        self.present_level = present_level
+        self._score = 0.0
+
+    def _evidence(self, found, similarity):
+        self._score += self.smoothing * ((0.0 if found else 1.0) - self._score)
+        if self._score >= self.absent_level:
+            return DECISION_ABSENT
+        if found and self._score <= self.present_level:
+            return DECISION_PRESENT
+        return DECISION_UNDECIDED
+
+    def _reset_evidence(self):
+        self._score = 0.0
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["score"] = self._score
+        return stats
+
+
+POLICIES = {
+    SprtPolicy.name: SprtPolicy,
+    EmaPolicy.name: EmaPolicy,
+}
+
+
+def create_policy(name=DECISION_POLICY, **kwargs):
+    if name not in POLICIES:
+        raise ValueError(f"Unknown decision policy '{name}'; expected one of {sorted(POLICIES)}.")
+    return POLICIES[name](**kwargs)
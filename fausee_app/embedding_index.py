@@ -0,0 +1,229 @@
+import os
+import threading
+
+import numpy as np
+
+INDEX_MODE_EXACT = "exact"
+INDEX_MODE_IVF = "ivf"
+
+EMBEDDING_DIM = 512
+# IVF defaults: nlist=None picks ~sqrt(n) lists; more lists probed -> better recall, slower queries.
+IVF_NLIST = None
+IVF_NPROBE = 8
+IVF_TRAIN_ITERATIONS = 10
+IVF_TRAIN_SAMPLE = 20000
+# Below this many vectors per list an IVF index searches exhaustively instead.
+IVF_MIN_POINTS_PER_LIST = 4
+# add() retrains once the index has grown by this factor since the last training,
+# so lists (and, with IVF_NLIST=None, their number) keep up with enrollment.
+IVF_RETRAIN_GROWTH = 2.0
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores, k):
+    """Indices of the k highest scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == scores.shape[1]:
+        idx = np.argsort(-scores, axis=1)
+    else:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, idx, axis=1), axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+    return idx[:, :k]
+
+
+class EmbeddingIndex:
+    """
+    1:N cosine-similarity index over L2-normalised face embeddings.
+
+    `exact` mode scores a query against every row in one matrix product.
+    `ivf` mode clusters the rows with spherical k-means into `nlist` inverted
+    lists and only scores the rows of the `nprobe` closest lists; raise
+    `nprobe` for recall, lower it for latency.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM, mode=INDEX_MODE_EXACT, nlist=IVF_NLIST, nprobe=IVF_NPROBE, seed=0):
+        if mode not in (INDEX_MODE_EXACT, INDEX_MODE_IVF):
+            raise ValueError(f"Unknown index mode '{mode}'.")
+        self.dim = dim
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+
+        self._lock = threading.RLock()
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._labels = np.empty((0,), dtype=str)
+        self._centroids = None
+        self._assign = np.empty((0,), dtype=np.int32)
+        self._list_order = None
+        self._list_bounds = None
+        self._trained_size = 0
+
+    def __len__(self):
+        return self._vectors.shape[0]
+
+    @property
+    def is_trained(self):
+        """True when queries go through the IVF lists rather than a full scan."""
+        return self._centroids is not None
+
+    # ----------- Build / mutate -----------
+
+    def build(self, embeddings, labels):
+        """Replace the index content and (in ivf mode) retrain the coarse quantizer."""
+        vectors = _normalize(embeddings)
+        labels = np.asarray(labels, dtype=str)
+        if vectors.shape[0] != labels.shape[0]:
+            raise ValueError("embeddings and labels must have the same length.")
+        with self._lock:
+            self._vectors = vectors
+            self._labels = labels
+            self._centroids = None
+            if self.mode == INDEX_MODE_IVF:
+                self.train()
+
+    def add(self, embeddings, labels):
+        vectors = _normalize(embeddings)
+        labels = np.asarray(labels, dtype=str).reshape(-1)
+        if vectors.shape[0] != labels.shape[0]:
+            raise ValueError("embeddings and labels must have the same length.")
+        with self._lock:
+            self._vectors = np.vstack([self._vectors, vectors])
+            self._labels = np.concatenate([self._labels, labels])
+            if self._centroids is not None and len(self) < self._trained_size * IVF_RETRAIN_GROWTH:
+                self._assign = np.concatenate([self._assign, self._nearest_centroid(vectors)])
+                self._rebuild_lists()
+            elif self.mode == INDEX_MODE_IVF:
+                self.train()
+
+    def remove(self, labels):
+        """Drop every row carrying one of `labels`; returns the number removed."""
+        with self._lock:
+            keep = ~np.isin(self._labels, np.asarray(labels, dtype=str))
+            removed = int((~keep).sum())
+            if removed:
+                self._vectors = self._vectors[keep]
+                self._labels = self._labels[keep]
+                if self._centroids is not None:
+                    self._assign = self._assign[keep]
+                    self._rebuild_lists()
+            return removed
+
+    def train(self, iterations=IVF_TRAIN_ITERATIONS):
+        """Spherical k-means over (a sample of) the stored vectors."""
+        with self._lock:
+            n = len(self)
+            nlist = self.nlist or max(1, int(np.sqrt(n)))
+            self._trained_size = n
+            if n < nlist * IVF_MIN_POINTS_PER_LIST:
+                self._centroids = None
+                return
+
+            rng = np.random.default_rng(self.seed)
+            sample = self._vectors
+            if n > IVF_TRAIN_SAMPLE:
+                sample = sample[rng.choice(n, IVF_TRAIN_SAMPLE, replace=False)]
+            centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assign = np.argmax(sample @ centroids.T, axis=1)
+                counts = np.bincount(assign, minlength=nlist)
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+                nonempty = counts > 0
+                sums = centroids.copy()  # empty lists keep their previous centroid
+                sums[nonempty] = np.add.reduceat(sample[np.argsort(assign, kind="stable")],
+                                                 starts[nonempty], axis=0)
+                centroids = _normalize(sums)
+
+            self._centroids = centroids
+            self._assign = self._nearest_centroid(self._vectors)
+            self._rebuild_lists()
+
+    def _nearest_centroid(self, vectors):
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _rebuild_lists(self):
+        self._list_order = np.argsort(self._assign, kind="stable")
+        sorted_assign = self._assign[self._list_order]
+        self._list_bounds = np.searchsorted(sorted_assign, np.arange(self._centroids.shape[0] + 1))
+
+    # ----------- Query -----------
+
+    def search(self, queries, k=1, nprobe=None):
+        """
+        Returns (scores, labels): both shaped (num_queries, k'), best match first,
+        where k' = min(k, number of candidates). Empty index -> empty arrays.
+        """
+        queries = _normalize(queries)
+        with self._lock:
+            vectors, labels, centroids = self._vectors, self._labels, self._centroids
+            list_order, list_bounds = self._list_order, self._list_bounds
+
+        if vectors.shape[0] == 0:
+            return np.empty((queries.shape[0], 0), dtype=np.float32), np.empty((queries.shape[0], 0), dtype=str)
+
+        if centroids is None:
+            scores = queries @ vectors.T
+            idx = _top_k(scores, k)
+            return np.take_along_axis(scores, idx, axis=1), labels[idx]
+
+        nprobe = min(nprobe or self.nprobe, centroids.shape[0])
+        probe = _top_k(queries @ centroids.T, nprobe)
+        k_out = min(k, vectors.shape[0])
+        out_scores = np.full((queries.shape[0], k_out), -np.inf, dtype=np.float32)
+        out_labels = np.full((queries.shape[0], k_out), "", dtype=labels.dtype)
+        for q in range(queries.shape[0]):
+            rows = np.concatenate([list_order[list_bounds[c]:list_bounds[c + 1]] for c in probe[q]])
+            if rows.size == 0:
+                continue
+            scores = vectors[rows] @ queries[q]
+            idx = _top_k(scores[None, :], k_out)[0]
+            out_scores[q, :idx.size] = scores[idx]
+            out_labels[q, :idx.size] = labels[rows[idx]]
+        return out_scores, out_labels
+
+    def memory_bytes(self):
+        total = self._vectors.nbytes + self._labels.nbytes + self._assign.nbytes
+        if self._centroids is not None:
+            total += self._centroids.nbytes + self._list_order.nbytes + self._list_bounds.nbytes
+        return total
+
+    # ----------- Persistence -----------
+
+    def save(self, path):
+        """Atomic write: a crash mid-save never leaves a truncated index behind."""
+        with self._lock:
+            arrays = {
+                "vectors": self._vectors,
+                "labels": self._labels,
+                "meta": np.array([self.dim, self.nlist or 0, self.nprobe, self.seed], dtype=np.int64),
+                "mode": np.array(self.mode),
+            }
+            if self._centroids is not None:
+                arrays["centroids"] = self._centroids
+                arrays["assign"] = self._assign
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            dim, nlist, nprobe, seed = (int(v) for v in data["meta"])
+            index = cls(dim=dim, mode=str(data["mode"]), nlist=nlist or None, nprobe=nprobe, seed=seed)
+            index._vectors = data["vectors"]
+            index._labels = data["labels"]
+            if "centroids" in data:
+                index._centroids = data["centroids"]
+                index._assign = data["assign"]
+                index._trained_size = index._vectors.shape[0]
+                index._rebuild_lists()
+        return index
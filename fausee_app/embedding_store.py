@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+EMBEDDING_STORE_DIR = "embeddings"
+# Bump when alignment or normalisation changes so old vectors are recomputed.
+EMBEDDING_STORE_VERSION = 1
+
+
+def image_digest(data):
+    """sha256 of the encoded image bytes, as stored on disk."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Durable, content-addressed cache of reference embeddings. An entry is keyed
+    by the image's sha256 together with the model signature and store version,
+    so a changed photo, model pack or model file simply misses and is
+    recomputed. Entries are written atomically; prune() deletes the ones that
+    can no longer be hit.
+    """
+
+    def __init__(self, root_dir, signature_fn):
+        self.root_dir = root_dir
+        # Resolved on first use: it may need the model pack to be chosen.
+        self._signature_fn = signature_fn
+        self._signature = None
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = f"v{EMBEDDING_STORE_VERSION}|{self._signature_fn()}"
+        return self._signature
+
+    def _entry_path(self, digest):
+        key = hashlib.sha256(f"{digest}|{self.signature}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root_dir, f"{key[:40]}.npz")
+
+    def get(self, digest):
+        path = self._entry_path(digest)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                if str(entry["signature"]) != self.signature or str(entry["digest"]) != digest:
+                    return None
+                return entry["embedding"].copy()
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, digest, embedding, image_path=None):
+        path = self._entry_path(digest)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            os.makedirs(self.root_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez(f, embedding=np.asarray(embedding, dtype=np.float32), digest=digest,
+                         signature=self.signature, image_path=os.path.abspath(image_path or ""),
+                         created_at=time.time())
+            os.replace(tmp_path, path)
+
+    def prune(self):
+        """
+        Delete entries made with another model signature, leftover temp files,
+        and entries whose source image was replaced or deleted (keeping the
+        newest entry per image path). Returns the number removed.
+        """
+        if not os.path.isdir(self.root_dir):
+            return 0
+        newest = {}
+        stale = []
+        with self._lock:
+            for name in os.listdir(self.root_dir):
+                path = os.path.join(self.root_dir, name)
+                if name.endswith(".tmp"):
+                    stale.append(path)
+                    continue
+                if not name.endswith(".npz"):
+                    continue
+                try:
+                    with np.load(path, allow_pickle=False) as entry:
+                        signature = str(entry["signature"])
+                        image_path = str(entry["image_path"])
+                        created_at = float(entry["created_at"])
+                except (OSError, KeyError, ValueError):
+                    stale.append(path)
+                    continue
+                if signature != self.signature or (image_path and not os.path.exists(image_path)):
+                    stale.append(path)
+                    continue
+                if image_path:
+                    previous = newest.get(image_path)
+                    if previous is None or created_at > previous[0]:
+                        if previous is not None:
+                            stale.append(previous[1])
+                        newest[image_path] = (created_at, path)
+                    else:
+                        stale.append(path)
+
+            removed = 0
+            for path in stale:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
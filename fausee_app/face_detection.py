@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+
+
+def letterbox(frame, input_size):
+    """
+    Resize `frame` into a top-left aligned, zero padded canvas of `input_size`
+    (width, height), exactly like insightface's detector does before inference.
+    Returns the canvas and the scale factor applied to the frame.
+    """
+    input_w, input_h = input_size
+    im_ratio = float(frame.shape[0]) / frame.shape[1]
+    model_ratio = float(input_h) / input_w
+    if im_ratio > model_ratio:
+        new_height = input_h
+        new_width = int(new_height / im_ratio)
+    else:
+        new_width = input_w
+        new_height = int(new_width * im_ratio)
+    det_scale = float(new_height) / frame.shape[0]
+
+    canvas = np.zeros((input_h, input_w, 3), dtype=np.uint8)
+    canvas[:new_height, :new_width, :] = cv2.resize(frame, (new_width, new_height))
+    return canvas, det_scale
+
+
+def detect_first_face(det_model, frame, threshold=None, input_size=None):
+    """
+    Presence-only detection: runs the SCRFD forward pass and returns the box
+    (x1, y1, x2, y2, score) of the best anchor above the threshold, in frame
+    coordinates, or None. NMS, landmark alignment and every per-face head
+    (recognition, genderage, landmarks) are skipped entirely.
+    """
+    if threshold is None:
+        threshold = det_model.det_thresh
+    det_img, det_scale = letterbox(frame, input_size or det_model.input_size)
+    scores_list, bboxes_list, _ = det_model.forward(det_img, threshold)
+    best = None
+    for scores, bboxes in zip(scores_list, bboxes_list):
+        scores = scores.ravel()
+        if len(scores):
+            i = int(np.argmax(scores))
+            if best is None or scores[i] > best[4]:
+                best = np.append(bboxes[i] / det_scale, scores[i])
+    return best
+
+
+def detect_any_face(det_model, frame, threshold=None, input_size=None):
+    return detect_first_face(det_model, frame, threshold, input_size) is not None
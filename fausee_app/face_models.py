@@ -0,0 +1,283 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import insightface
+import numpy as np
+import onnxruntime
+from insightface.app.common import Face
+from insightface.model_zoo import ArcFaceONNX, RetinaFace
+from insightface.utils import ensure_available
+from insightface.utils.face_align import norm_crop
+
+from onnx_model_cache import OPTIMIZED_MODEL_CACHE, OPTIMIZED_MODEL_DIR, create_session, model_digest
+from runtime_tuning import build_session_options
+
+# buffalo_l (most accurate) .. buffalo_sc (fastest). With MODEL_AUTO_SELECT the pack is
+# instead picked once per machine by model_selection.ModelPackSelector.
+MODEL_PACK = "buffalo_l"
+MODEL_AUTO_SELECT = False
+MODEL_ROOT = "~/.insightface"
+MODEL_PROVIDERS = ["CPUExecutionProvider"]
+DET_SIZE = (320, 320)
+DET_THRESH = 0.5
+
+MODE_PRESENCE = "presence"
+MODE_REFERENCE = "reference"
+
+# Heads each monitoring mode actually uses; anything else is never loaded.
+MODE_TASKS = {
+    MODE_PRESENCE: ("detection",),
+    MODE_REFERENCE: ("detection", "recognition"),
+}
+
+# buffalo_* packs name their files det_<flops>.onnx and w600k_<backbone>.onnx,
+# so heads can be picked by file name without opening a session per file.
+TASK_FILE_PATTERNS = {
+    "detection": "det_*.onnx",
+    "recognition": "w600k_*.onnx",
+}
+
+PRECISION_FP32 = "fp32"
+PRECISION_INT8_DYNAMIC = "int8_dynamic"
+PRECISION_INT8_STATIC = "int8_static"
+QUANTIZED_SUBDIR = "quantized"
+# Per-head precision. INT8 variants are produced by model_quantization.py and
+# compared against fp32 with benchmarks/bench_quantization.py.
+MODEL_PRECISION = {
+    "detection": PRECISION_FP32,
+    "recognition": PRECISION_FP32,
+}
+
+# ArcFace heads in the buffalo packs take 112x112 aligned crops.
+RECOGNITION_CROP_SIZE = 112
+
+# Create a mode's sessions on parallel threads instead of one after another.
+MODEL_PARALLEL_LOAD = True
+# Batch sizes the recognition head is run at during warm-up.
+WARMUP_RECOGNITION_BATCHES = (1,)
+
+TASK_MODEL_CLASSES = {
+    "detection": RetinaFace,
+    "recognition": ArcFaceONNX,
+}
+
+
+def variant_path(model_file, precision):
+    """Location of the `precision` variant of an fp32 pack file."""
+    if precision == PRECISION_FP32:
+        return model_file
+    stem = os.path.splitext(os.path.basename(model_file))[0]
+    return os.path.join(os.path.dirname(model_file), QUANTIZED_SUBDIR, f"{stem}.{precision}.onnx")
+
+
+def align_crops(img, kpss, image_size=RECOGNITION_CROP_SIZE):
+    """ArcFace-aligned crops for each face's 5 landmarks, ready for embed_crops()."""
+    return [norm_crop(img, landmark=kps, image_size=image_size) for kps in kpss]
+
+
+class FaceModels:
+    """
+    On-demand replacement for insightface's FaceAnalysis. Each head gets its own
+    ONNX session the first time a mode needs it, instead of the whole pack being
+    loaded up front.
+    """
+
+    def __init__(self, logger_manager, pack=MODEL_PACK, root=MODEL_ROOT,
+                 det_size=DET_SIZE, det_thresh=DET_THRESH, providers=None, session_options=None,
+                 precision=None, pack_selector=None, optimized_cache=OPTIMIZED_MODEL_CACHE):
+        self.logger = logger_manager
+        self.pack = pack
+        self.root = root
+        self.det_size = det_size
+        self.det_thresh = det_thresh
+        self.providers = providers or MODEL_PROVIDERS
+        self.session_options = session_options or build_session_options()
+        self.precision = dict(MODEL_PRECISION, **(precision or {}))
+        # Load graphs ORT already optimized on an earlier start (onnx_model_cache).
+        self.optimized_cache = optimized_cache and session_options is None
+        # Resolves the pack on first load (e.g. ModelPackSelector.choose), not at construction.
+        self.pack_selector = pack_selector
+        self._models = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._dir_lock = threading.Lock()
+        self._model_dir = None
+
+    # ----------- Loading -----------
+
+    def use_mode(self, mode):
+        """Load the heads `mode` needs and drop any the mode does not use."""
+        needed = MODE_TASKS[mode]
+        with self._lock:
+            for task in list(self._models):
+                if task not in needed:
+                    self._models.pop(task)
+                    self.logger.log_event(f"Unloaded '{task}' model (not used in {mode} mode).")
+        self.ensure_mode(mode)
+
+    def ensure_mode(self, mode):
+        with self._lock:
+            missing = [task for task in MODE_TASKS[mode] if task not in self._models]
+        if MODEL_PARALLEL_LOAD and len(missing) > 1:
+            self._resolve_model_dir()  # pick the pack once, before the loads race for it
+            with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="model-load") as pool:
+                list(pool.map(self.get_model, missing))
+        for task in MODE_TASKS[mode]:
+            self.get_model(task)
+
+    def get_model(self, task):
+        with self._lock:
+            model = self._models.get(task)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(task, threading.Lock())
+        # Sessions are created outside self._lock so different heads load concurrently.
+        with load_lock:
+            with self._lock:
+                model = self._models.get(task)
+            if model is None:
+                model = self._load(task)
+                with self._lock:
+                    self._models[task] = model
+            return model
+
+    def warm_up(self, mode, det_sizes=(), rec_batches=WARMUP_RECOGNITION_BATCHES):
+        """
+        Load `mode`'s heads and run each once on a blank input at every detector
+        size in `det_sizes` (plus the default), so ONNX Runtime's lazy allocations
+        and kernel selection happen here rather than on the first real frame.
+        Returns the session-load and warm-up times in ms.
+        """
+        start = time.perf_counter()
+        self.ensure_mode(mode)
+        loaded = time.perf_counter()
+
+        sizes = list(dict.fromkeys(tuple(size) for size in [self.det_size, *det_sizes]))
+        det_model = self.det_model
+        for width, height in sizes:
+            det_model.detect(np.zeros((height, width, 3), dtype=np.uint8), input_size=(width, height),
+                             max_num=0, metric='default')
+        if "recognition" in MODE_TASKS[mode]:
+            crop = np.zeros((RECOGNITION_CROP_SIZE, RECOGNITION_CROP_SIZE, 3), dtype=np.uint8)
+            for batch in rec_batches:
+                self.embed_crops([crop] * batch)
+        done = time.perf_counter()
+        return {"load_ms": (loaded - start) * 1000, "warmup_ms": (done - loaded) * 1000, "det_sizes": sizes}
+
+    def loaded_tasks(self):
+        with self._lock:
+            return list(self._models)
+
+    def _resolve_model_dir(self):
+        with self._dir_lock:
+            if self._model_dir is None:
+                if self.pack_selector is not None:
+                    self.pack = self.pack_selector()
+                    self.pack_selector = None
+                self._model_dir = ensure_available('models', self.pack, root=self.root)
+            return self._model_dir
+
+    def model_file(self, task):
+        matches = sorted(glob.glob(os.path.join(self._resolve_model_dir(), TASK_FILE_PATTERNS[task])))
+        if not matches:
+            raise FileNotFoundError(f"No '{task}' model found in pack '{self.pack}'.")
+        return matches[0]
+
+    def variant_file(self, task):
+        """Configured precision variant for `task`, falling back to fp32 if it was never built."""
+        model_file = self.model_file(task)
+        precision = self.precision.get(task, PRECISION_FP32)
+        candidate = variant_path(model_file, precision)
+        if not os.path.exists(candidate):
+            self.logger.log_event(
+                f"No {precision} variant of '{task}' model at '{candidate}'; using fp32.", level="warning"
+            )
+            return model_file
+        return candidate
+
+    def model_signature(self):
+        """
+        Everything a reference embedding depends on: pack, the head files in use
+        (name and content digest), detector input size and insightface version.
+        """
+        files = [self.variant_file(task) for task in MODE_TASKS[MODE_REFERENCE]]  # resolves the pack
+        # Digests are memoised by size and mtime, so this only hashes a file after it changed.
+        digest_dir = os.path.expanduser(OPTIMIZED_MODEL_DIR)
+        parts = [self.pack] + [f"{os.path.basename(f)}:{model_digest(f, digest_dir)}" for f in files]
+        parts.append("x".join(str(v) for v in self.det_size))
+        parts.append(insightface.__version__)
+        return "|".join(parts)
+
+    def _load(self, task):
+        try:
+            model_file = self.variant_file(task)
+            if self.optimized_cache:
+                session = create_session(self.logger, model_file, self.providers)
+            else:
+                session = onnxruntime.InferenceSession(model_file, sess_options=self.session_options,
+                                                       providers=self.providers)
+            model = TASK_MODEL_CLASSES[task](model_file=model_file, session=session)
+            if task == "detection":
+                model.prepare(0, input_size=self.det_size, det_thresh=self.det_thresh)
+            else:
+                model.prepare(0)
+        except Exception as e:
+            self.logger.log_event(f"Failed to load '{task}' model from pack '{self.pack}': {e}", level="critical")
+            raise
+        self.logger.log_event(f"Loaded '{task}' model: {os.path.basename(model_file)} ({self.pack}).")
+        return model
+
+    # ----------- Inference -----------
+
+    @property
+    def det_model(self):
+        return self.get_model("detection")
+
+    @property
+    def rec_model(self):
+        return self.get_model("recognition")
+
+    def detect(self, img, max_num=0):
+        """Detector only: returns (bboxes N x 5 with score, kpss N x 5 x 2)."""
+        return self.det_model.detect(img, max_num=max_num, metric='default')
+
+    def embed(self, img, bbox, kps):
+        """L2-normalised recognition embedding for one detected face."""
+        face = Face(bbox=bbox, kps=kps)
+        embedding = self.rec_model.get(img, face)
+        return embedding / np.linalg.norm(embedding)
+
+    def embed_crops(self, crops):
+        """
+        L2-normalised embeddings (N x 512) for aligned crops, computed in one
+        session run on the batch dimension. Heads exported with a fixed batch of
+        1 are run crop by crop instead.
+        """
+        rec_model = self.rec_model
+        crops = list(crops)
+        if not crops:
+            return np.zeros((0, rec_model.output_shape[-1]), dtype=np.float32)
+        batch_dim = rec_model.input_shape[0]
+        if isinstance(batch_dim, int) and batch_dim == 1:
+            embeddings = np.vstack([rec_model.get_feat(crop) for crop in crops])
+        else:
+            embeddings = rec_model.get_feat(crops)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def get(self, img, max_num=0):
+        """FaceAnalysis.get() equivalent running only the heads currently loaded."""
+        det_model = self.det_model
+        with self._lock:
+            heads = [model for task, model in self._models.items() if task != "detection"]
+
+        bboxes, kpss = det_model.detect(img, max_num=max_num, metric='default')
+        faces = []
+        for i in range(bboxes.shape[0]):
+            face = Face(bbox=bboxes[i, 0:4], kps=kpss[i] if kpss is not None else None, det_score=bboxes[i, 4])
+            for model in heads:
+                model.get(img, face)
+            faces.append(face)
+        return faces
@@ -2,18 +2,29 @@ import cv2
 import time
 import numpy as np
 import ctypes
-import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
 import threading
-from insightface.app import FaceAnalysis
-import win32gui
-import win32ts
-import win32api
-import sys
 import os
-from datetime import datetime
-import tempfile
+import sys
+import glob
+from collections import deque
+
+from frame_sources import create_frame_source, FrameSourceExhausted, FRAME_SOURCE
+from roi_detector import RoiDetector
+from resolution_controller import ResolutionController
+from frame_pipeline import WatchPipeline
+from decision_policy import create_policy, DECISION_ABSENT, DECISION_PRESENT
+from metrics import MetricsRegistry
+from alert_overlay import AlertOverlayService
+from face_models import align_crops, DET_SIZE, FaceModels, MODE_PRESENCE, MODE_REFERENCE, MODEL_AUTO_SELECT, MODEL_PACK
+from frame_gate import FrameGate, GATE_UNCHANGED, GATE_UNUSABLE
+from face_tracker import FaceTracker
+from sampling_scheduler import AdaptiveScheduler
+from reference_gallery import ReferenceGallery
+from embedding_index import EmbeddingIndex, INDEX_MODE_EXACT
+from embedding_store import EmbeddingStore, EMBEDDING_STORE_DIR, image_digest
+from runtime_tuning import apply_process_tuning, report_runtime_settings
+from model_selection import ModelPackSelector, PACK_SELECTION_FILE
+from inference_worker import INFERENCE_OUT_OF_PROCESS, RemoteFaceModels
 
 # Constants
 WM_WTSSESSION_CHANGE = 0x02B1
@@ -21,13 +32,27 @@ WTS_SESSION_LOCK = 0x7
 WTS_SESSION_UNLOCK = 0x8
 
 SIMILARITY_THRESHOLD = 0.5
-FRAME_RESIZE = (640, 480)
-DET_SIZE = (320, 320)
 CAMERA_DOWNTIME_ALERT_INTERVAL = 30
 CAMERA_RETRY_DELAY = 5
-EMPLOYEE_RETRIES = 100
 EMPLOYEE_RETRY_DELAY = 2
 SUCCESS_RESTART_DELAY = 5
+REFERENCE_IMAGE = "user.jpg"
+# A replacement photo is captured here and only becomes user.jpg once it yields an embedding.
+PENDING_REFERENCE_IMAGE = "user.pending.jpg"
+# Extra enrollments added with add_reference_image(): user_2.jpg, user_3.jpg, ...
+EXTRA_REFERENCE_GLOB = "user_[0-9]*.jpg"
+# Extras of a replaced reference are moved here instead of staying enrolled.
+REPLACED_REFERENCE_DIR = "replaced"
+IDENTITY_INDEX_FILE = "identity_index.npz"
+IDENTITY_INDEX_MODE = INDEX_MODE_EXACT
+# Photos enrolled through /api/identities, under the image directory.
+IDENTITY_IMAGE_DIR = "identities"
+# During a miss streak, crops from this many frames share one recognition call (1 = per frame).
+RECOGNITION_FRAME_BATCH = 1
+# Mode whose models are loaded and warmed at app startup, before a mode is chosen.
+# None keeps user-003's behaviour of loading nothing until monitoring starts; the
+# chosen mode is then warmed by start_recognition_loop().
+MODEL_WARMUP_MODE = None
 
 pause_recognition = threading.Event()
 pause_recognition.clear()
@@ -36,54 +61,150 @@ pause_recognition.clear()
 class FaceRecognitionManager:
     def __init__(self, logger_manager, image_dir):
         self.logger = logger_manager
-        self.app = self._init_face_model()
-        self._remove_unneeded_models()
+        self.app_data_dir = os.path.dirname(os.path.abspath(image_dir))
+        apply_process_tuning(self.logger)
+        # Models are loaded per monitoring mode on first use, not at construction.
+        selection_path = os.path.join(self.app_data_dir, PACK_SELECTION_FILE) if MODEL_AUTO_SELECT else None
+        if INFERENCE_OUT_OF_PROCESS:
+            # Same interface, but sessions live in a worker process fed through shared memory.
+            self.models = RemoteFaceModels(self.logger, pack=MODEL_PACK, det_size=DET_SIZE,
+                                           selection_path=selection_path)
+        else:
+            self.models = FaceModels(self.logger, pack=MODEL_PACK, det_size=DET_SIZE)
+            if selection_path:
+                self.models.pack_selector = ModelPackSelector(self.logger, selection_path, det_size=DET_SIZE).choose
+        report_runtime_settings(self.logger, self.models.session_options)
         self.pause_recognition = threading.Event()
         self.pause_recognition.clear()
-        self.embedding_cache_path = os.path.join(tempfile.gettempdir(), "face_verifier.npy")
+        # Reference embeddings survive restarts, keyed by image content and model.
+        self.embedding_store = EmbeddingStore(os.path.join(self.app_data_dir, EMBEDDING_STORE_DIR),
+                                              self.models.model_signature)
         self.image_dir = image_dir
-
-        if os.path.exists(self.embedding_cache_path):
+        # Hot-path timers and counters, exported by /api/metrics.
+        self.metrics = MetricsRegistry()
+        # Live camera by default; FRAME_SOURCE selects a video file, image directory or synthetic feed.
+        self.frame_source = create_frame_source(self.logger, FRAME_SOURCE, metrics=self.metrics)
+        self.frame_gate = FrameGate()
+        self.face_tracker = FaceTracker()
+        self.roi_detector = RoiDetector()
+        # Frame size and detector input size, stepped to keep inference within budget;
+        # starts at the level of DET_SIZE, the size the model pack was chosen for.
+        self.resolution = ResolutionController()
+        self.scheduler = AdaptiveScheduler()
+        # Set by the running watch loop; kept afterwards so its counters stay readable.
+        self.pipeline = None
+        self.decision_policy = None
+        # Full-screen alert on its own UI thread; the watch loop only posts show/hide.
+        self.alert_overlay = AlertOverlayService(self.logger)
+        # Called when the user is judged absent; returns True if the session really
+        # locked, so monitoring waits for the unlock event. Replaceable for replays.
+        self.lock_action = self._default_lock_action
+        self.last_similarity = None
+        self._last_check_found = True
+        self._retry_crops = deque()
+        self._warmup_lock = threading.Lock()
+        self._warmed_mode = None
+        self._warmup_thread = None
+
+        # Filled on demand by ensure_reference_embedding() when reference mode starts.
+        # The running loop reads it on every frame, so swapping it takes effect live.
+        self.gallery = ReferenceGallery()
+        self._gallery_version = self.gallery.version
+
+        # 1:N index for shared workstations; loaded from disk the first time it is used.
+        self.identity_index_path = os.path.join(self.app_data_dir, IDENTITY_INDEX_FILE)
+        self.identity_index = None
+        self._identity_lock = threading.Lock()
+
+    # ----------- Model warm-up -----------
+
+    def _warmup_det_sizes(self):
+        return self.resolution.det_sizes() + [self.roi_detector.det_size]
+
+    def prepare_models(self, mode):
+        """Switch the models to `mode` and warm them up at every detector size the loop may use."""
+        with self._warmup_lock:
+            self.models.use_mode(mode)
+            if self._warmed_mode == mode:
+                return
+            start = time.perf_counter()
             try:
-                os.remove(self.embedding_cache_path)
-                self.logger.log_event("Cleaned old reference embedding cache on startup.")
+                timings = self.models.warm_up(mode, self._warmup_det_sizes())
             except Exception as e:
-                self.logger.log_event(f"Failed to clean cache on startup: {e}", level="warning")
+                self.logger.log_event(f"Model warm-up for {mode} mode failed: {e}", level="warning")
+                return
+            self._warmed_mode = mode
+            self.logger.log_event(
+                f"Models ready for {mode} mode in {(time.perf_counter() - start) * 1000:.0f} ms "
+                f"(sessions {timings['load_ms']:.0f} ms, warm-up {timings['warmup_ms']:.0f} ms "
+                f"at {len(timings['det_sizes'])} detector size(s))."
+            )
 
-        self.ref_embedding = self.load_or_fetch_embedding()
+    def start_model_warmup(self, mode=MODEL_WARMUP_MODE):
+        """prepare_models() on a background thread; the watch loops wait for it if it is still running."""
+        if mode is None or (self._warmup_thread is not None and self._warmup_thread.is_alive()):
+            return
+        self._warmup_thread = threading.Thread(target=self.prepare_models, args=(mode,), daemon=True)
+        self._warmup_thread.start()
 
     # ----------- Embedding bootstrap & caching -----------
 
+    def _reference_image_paths(self):
+        main = os.path.join(self.image_dir, REFERENCE_IMAGE)
+        extras = sorted(glob.glob(os.path.join(self.image_dir, EXTRA_REFERENCE_GLOB)))
+        return ([main] if os.path.exists(main) else []) + extras
+
+    def _archive_extra_reference_images(self):
+        """Move user_N.jpg enrollments aside so they stop unlocking after the reference is replaced."""
+        extras = sorted(glob.glob(os.path.join(self.image_dir, EXTRA_REFERENCE_GLOB)))
+        if not extras:
+            return
+        archive_dir = os.path.join(self.image_dir, REPLACED_REFERENCE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(archive_dir, exist_ok=True)
+        for path in extras:
+            os.replace(path, os.path.join(archive_dir, os.path.basename(path)))
+        self.logger.log_event(f"Archived {len(extras)} extra reference image(s) to {archive_dir}.")
+
     def load_or_fetch_embedding(self):
-        embedding = self._fetch_embedding_from_local_image()
-        if embedding is not None:
-            try:
-                np.save(self.embedding_cache_path, embedding)
-                self.logger.log_event("Saved new reference embedding to cache.")
-            except Exception as e:
-                self.logger.log_event(f"Failed to save embedding cache. Error: {e}", level="warning")
-        return embedding
+        """Embed every enrollment image (user.jpg, user_2.jpg, ...) into one gallery matrix."""
+        embeddings = []
+        for image_path in self._reference_image_paths():
+            embedding = self._fetch_embedding_from_local_image(image_path)
+            if embedding is not None:
+                embeddings.append(embedding)
+        if not embeddings:
+            return None
+
+        try:
+            removed = self.embedding_store.prune()
+            if removed:
+                self.logger.log_event(f"Removed {removed} stale embedding store entr{'y' if removed == 1 else 'ies'}.")
+        except Exception as e:
+            self.logger.log_event(f"Failed to prune embedding store. Error: {e}", level="warning")
+        return np.vstack(embeddings)
 
     def ensure_reference_embedding(self):
-        """Ensure we have a usable ref embedding."""
-        if self.ref_embedding is not None:
-            return self.ref_embedding
+        """Ensure we have a usable reference gallery."""
+        gallery = self.gallery.snapshot()
+        if gallery is not None:
+            return gallery
 
-        image_path = os.path.join(self.image_dir, "user.jpg")
-        if not os.path.exists(image_path):
+        if not self._reference_image_paths():
             self.logger.log_event("No user.jpg found. Reference embedding not available.", level="warning")
             return None
 
-        embedding = self._fetch_embedding_from_local_image()
-        if embedding is not None:
-            np.save(self.embedding_cache_path, embedding)
-            self.ref_embedding = embedding
-        return self.ref_embedding
+        self.gallery.swap(self.load_or_fetch_embedding())
+        return self.gallery.snapshot()
 
-    def capture_reference_image_interactive(self, parent=None):
+    def capture_reference_image_interactive(self, parent=None, filename=REFERENCE_IMAGE):
         """
         Opens a modal Toplevel window to let user capture a webcam photo as reference.
         """
+        # Tk and PIL are only needed for this dialog and the alert overlay.
+        import tkinter as tk
+        from tkinter import messagebox
+        from PIL import Image, ImageTk
+
         if parent is None:
             root = tk.Tk()
         else:
@@ -93,8 +214,9 @@ class FaceRecognitionManager:
         root.transient(parent)
         root.grab_set()
 
-        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        if not cap.isOpened():
+        self.frame_source.acquire()
+        if not self.frame_source.wait_until_healthy(timeout=CAMERA_RETRY_DELAY):
+            self.frame_source.release()
             self.logger.log_event("Camera not available for reference capture.", level="critical")
             messagebox.showerror("Camera Error", "Could not access the camera.", parent=root)
             root.destroy()
@@ -104,13 +226,14 @@ class FaceRecognitionManager:
         panel.pack(padx=10, pady=10)
 
         captured_frame = [None]
+        saved = [False]
         preview_active = True
 
         def show_frame():
             if not preview_active:
                 return
-            ret, frame = cap.read()
-            if ret:
+            frame = self.frame_source.latest_frame()
+            if frame is not None:
                 cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 img = Image.fromarray(cv2image)
                 imgtk = ImageTk.PhotoImage(image=img)
@@ -121,8 +244,10 @@ class FaceRecognitionManager:
 
         def close_window():
             nonlocal preview_active
+            if not preview_active:
+                return
             preview_active = False
-            cap.release()
+            self.frame_source.release()
             root.destroy()
             if parent:
                 parent.focus_set()
@@ -130,8 +255,8 @@ class FaceRecognitionManager:
         def accept():
             if captured_frame[0] is not None:
                 os.makedirs(self.image_dir, exist_ok=True)
-                save_path = os.path.join(self.image_dir, "user.jpg")
-                cv2.imwrite(save_path, captured_frame[0])
+                save_path = os.path.join(self.image_dir, filename)
+                saved[0] = cv2.imwrite(save_path, captured_frame[0])
                 self.logger.log_event(f"Reference image saved at {save_path}.")
                 close_window()
             else:
@@ -147,32 +272,87 @@ class FaceRecognitionManager:
         show_frame()
         root.wait_window()
 
-        if os.path.exists(os.path.join(self.image_dir, "user.jpg")):
-            return os.path.join(self.image_dir, "user.jpg")
+        # Only a newly saved photo counts; cancelling keeps whatever was enrolled.
+        if saved[0]:
+            return os.path.join(self.image_dir, filename)
         return None
 
     def update_reference_image(self, parent_window=None):
-        """Force user to update reference image and recompute embedding."""
-        image_path = self.capture_reference_image_interactive(parent_window)
-        if image_path:
-            embedding = self._fetch_embedding_from_local_image()
-            if embedding is not None:
-                np.save(self.embedding_cache_path, embedding)
-                self.ref_embedding = embedding
-                self.logger.log_event("Reference image updated and embedding recomputed.")
+        """
+        Capture a new reference photo and make it the only enrollment. Returns
+        True on success; a cancelled capture or a photo without a usable face
+        leaves the current photos and live gallery untouched.
+        """
+        pending_path = self.capture_reference_image_interactive(parent_window, filename=PENDING_REFERENCE_IMAGE)
+        if not pending_path:
+            return False
+        reference_path = os.path.join(self.image_dir, REFERENCE_IMAGE)
+        # Stored under user.jpg's path, which it is about to become.
+        embedding = self._fetch_embedding_from_local_image(pending_path, store_path=reference_path)
+        if embedding is None:
+            os.remove(pending_path)
+            self.logger.log_event("New reference image rejected: no embedding could be computed; "
+                                  "keeping the current reference.", level="warning")
+            return False
 
-    def _fetch_embedding_from_local_image(self):
-        image_path = os.path.join(self.image_dir, "user.jpg")
+        # The new photo replaces the whole enrollment, not just user.jpg.
+        os.replace(pending_path, reference_path)
+        self._archive_extra_reference_images()
+        gallery = self.load_or_fetch_embedding()
+        self.gallery.swap(gallery if gallery is not None else embedding)
+        self.logger.log_event("Reference image updated and embedding recomputed.")
+        return True
+
+    def add_reference_image(self, parent_window=None):
+        """Capture an extra enrollment image and add it to the live gallery."""
+        n = len(self._reference_image_paths()) + 1
+        filename = f"user_{n}.jpg"
+        while os.path.exists(os.path.join(self.image_dir, filename)):
+            n += 1
+            filename = f"user_{n}.jpg"
+
+        image_path = self.capture_reference_image_interactive(parent_window, filename=filename)
+        if not image_path:
+            return False
+        embedding = self._fetch_embedding_from_local_image(image_path)
+        if embedding is None:
+            return False
+        self.gallery.add(embedding)
+        self.logger.log_event(f"Added reference image {filename} ({self.gallery.size()} enrolled).")
+        return True
+
+    def _fetch_embedding_from_local_image(self, image_path=None, store_path=None):
+        """Embedding of the first face in `image_path`; cached under `store_path` (default: image_path)."""
+        if image_path is None:
+            image_path = os.path.join(self.image_dir, REFERENCE_IMAGE)
         if not os.path.exists(image_path):
             self.logger.log_event(f"Reference image not found at '{image_path}'", level="critical")
             return None
 
-        img = cv2.imread(image_path)
+        try:
+            with open(image_path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            self.logger.log_event(f"Failed to read reference image. Error: {e}", level="critical")
+            return None
+
+        digest = image_digest(data)
+        try:
+            cached = self.embedding_store.get(digest)
+        except Exception as e:
+            self.logger.log_event(f"Embedding store lookup failed. Error: {e}", level="warning")
+            cached = None
+        if cached is not None:
+            self.logger.log_event(f"Loaded reference embedding for {os.path.basename(image_path)} from store.")
+            return cached
+
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
         if img is None:
             self.logger.log_event("Failed to read reference image (invalid image).", level="critical")
             return None
 
-        faces = self.app.get(img)
+        self.models.ensure_mode(MODE_REFERENCE)
+        faces = self.models.get(img)
         if not faces:
             self.logger.log_event("No face detected in the reference image.", level="critical")
             return None
@@ -180,27 +360,86 @@ class FaceRecognitionManager:
         ref_embed = faces[0].embedding
         normalized_embed = ref_embed / np.linalg.norm(ref_embed)
         self.logger.log_event("Successfully extracted reference face embedding from local image.")
-        return normalized_embed
-
-    # ----------- Model init / housekeeping -----------
-
-    def _init_face_model(self):
         try:
-            app = FaceAnalysis(name="buffalo_l", providers=["CPUExecutionProvider"])
-            app.prepare(ctx_id=0, det_size=DET_SIZE)
-            return app
+            self.embedding_store.put(digest, normalized_embed, store_path or image_path)
         except Exception as e:
-            self.logger.log_event(f"FATAL: Failed to initialize FaceAnalysis model: {e}", level="critical")
-            sys.exit(1)
+            self.logger.log_event(f"Failed to save embedding to store. Error: {e}", level="warning")
+        return normalized_embed
 
-    def _remove_unneeded_models(self):
-        if 'landmark_3d_68' in self.app.models:
-            self.app.models.pop('landmark_3d_68')
-        print("Insightface models loaded:", self.app.models)
+    # ----------- 1:N identification (shared workstations) -----------
+
+    def load_identity_index(self):
+        with self._identity_lock:
+            if self.identity_index is None:
+                if os.path.exists(self.identity_index_path):
+                    self.identity_index = EmbeddingIndex.load(self.identity_index_path)
+                    self.logger.log_event(f"Loaded identity index with {len(self.identity_index)} embedding(s).")
+                else:
+                    self.identity_index = EmbeddingIndex(mode=IDENTITY_INDEX_MODE)
+            return self.identity_index
+
+    def identity_image_path(self, label):
+        """Free file name for a new enrollment photo of `label` (already sanitised by the caller)."""
+        directory = os.path.join(self.image_dir, IDENTITY_IMAGE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        n = 1
+        while os.path.exists(os.path.join(directory, f"{label}_{n}.jpg")):
+            n += 1
+        return os.path.join(directory, f"{label}_{n}.jpg")
+
+    def enroll_identity(self, label, image_path):
+        embedding = self._fetch_embedding_from_local_image(image_path)
+        if embedding is None:
+            return False
+        index = self.load_identity_index()
+        with self._identity_lock:
+            index.add(embedding, [label])
+            index.save(self.identity_index_path)
+        self.logger.log_event(f"Enrolled identity '{label}' ({len(index)} embedding(s) indexed).")
+        return True
+
+    def remove_identity(self, label):
+        index = self.load_identity_index()
+        with self._identity_lock:
+            removed = index.remove([label])
+            if removed:
+                index.save(self.identity_index_path)
+        if removed:
+            self.logger.log_event(f"Removed identity '{label}' ({removed} embedding(s)).")
+        return removed
+
+    def identify_current_frame(self, k=1):
+        """identify_faces() on the newest camera frame; None if the camera delivers nothing."""
+        self.frame_source.acquire()
+        try:
+            if not self.frame_source.wait_until_healthy(timeout=CAMERA_RETRY_DELAY):
+                return None
+            _, frame = self.frame_source.get_frame(timeout=CAMERA_RETRY_DELAY)
+        finally:
+            self.frame_source.release()
+        if frame is None:
+            return None
+        return self.identify_faces(frame, k=k)
+
+    def identify_faces(self, frame, k=1):
+        """Return [(label, similarity)] for each detected face; label is None below threshold."""
+        index = self.load_identity_index()
+        self.models.ensure_mode(MODE_REFERENCE)
+        bboxes, kpss = self.models.detect(frame)
+        if bboxes.shape[0] == 0 or len(index) == 0:
+            return []
+        embeddings = self.models.embed_crops(align_crops(frame, kpss))
+        scores, labels = index.search(embeddings, k=k)
+        results = []
+        for i in range(bboxes.shape[0]):
+            score = float(scores[i, 0])
+            results.append((str(labels[i, 0]) if score > SIMILARITY_THRESHOLD else None, score))
+        return results
 
     # ----------- Session lock/unlock listener -----------
 
     def _wnd_proc(self, hwnd, msg, wparam, lparam):
+        import win32gui
         if msg == WM_WTSSESSION_CHANGE:
             if wparam == WTS_SESSION_LOCK:
                 self.logger.log_event("System locked")
@@ -211,6 +450,11 @@ class FaceRecognitionManager:
         return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
 
     def start_session_event_listener(self):
+        # pywin32 is imported here, on the listener thread, to keep it off the startup path.
+        import win32api
+        import win32gui
+        import win32ts
+
         wc = win32gui.WNDCLASS()
         hinst = wc.hInstance = win32api.GetModuleHandle(None)
         wc.lpszClassName = "SessionChangeListener"
@@ -222,29 +466,25 @@ class FaceRecognitionManager:
 
     # ----------- Camera helpers -----------
 
-    def is_camera_accessible(self, device_index=0):
-        self.logger.log_event(f"Checking camera accessibility on device {device_index}.")
-        cap = cv2.VideoCapture(device_index)
-        if not cap.isOpened():
-            return False
-        ret, _ = cap.read()
-        cap.release()
-        return ret
+    def is_camera_accessible(self):
+        """Camera health as seen by the capture service; never opens the device itself."""
+        return self.frame_source.is_healthy()
 
     def wait_for_camera(self):
-        if self.is_camera_accessible():
-            self.logger.log_event("Camera accessible again")
+        """
+        Block until the frame source delivers frames. Caller must hold the source.
+        Raises FrameSourceExhausted once a finite source has run out.
+        """
+        if self.frame_source.wait_until_healthy(timeout=CAMERA_RETRY_DELAY):
             return True
 
         downtime_start = time.time()
         next_alert_threshold = CAMERA_DOWNTIME_ALERT_INTERVAL
-        self.logger.log_event("Camera inaccessible", level="warning")
 
-        while True:
-            time.sleep(CAMERA_RETRY_DELAY)
-            if self.is_camera_accessible():
-                total_downtime = time.time() - downtime_start
-                self.logger.log_event("Camera accessible again")
+        while not self.pause_recognition.is_set():
+            if self.frame_source.exhausted:
+                raise FrameSourceExhausted(self.frame_source.describe())
+            if self.frame_source.wait_until_healthy(timeout=CAMERA_RETRY_DELAY):
                 return True
 
             elapsed_time = time.time() - downtime_start
@@ -254,149 +494,310 @@ class FaceRecognitionManager:
                     level="warning"
                 )
                 next_alert_threshold += CAMERA_DOWNTIME_ALERT_INTERVAL
+        return False
 
-    # ----------- UI / matching helpers -----------
-
-    def create_alert_window(self, text):
-        win = tk.Tk()
-        win.attributes('-fullscreen', True)
-        win.attributes('-topmost', True)
-        win.configure(bg='red')
-        label = tk.Label(
-            win,
-            text=text,
-            font=("Arial", 50),
-            fg="white",
-            bg="red"
-        )
-        label.pack(expand=True)
-        win.update()
-        return win
+    # ----------- Matching helpers -----------
 
-    def check_employee_in_frame(self, frame, ref_embed):
-        if ref_embed is None:
+    def check_employee_in_frame(self, frame):
+        """
+        True if an enrolled face is in the frame, False if not, or None while
+        the frame's crops are held for a RECOGNITION_FRAME_BATCH batch.
+        """
+        gallery = self.gallery.snapshot()
+        if gallery is None:
+            return False
+        if self._gallery_version != self.gallery.version:
+            # Tracks were verified against the previous gallery.
+            self.face_tracker.reset()
+            self._retry_crops.clear()
+            self._gallery_version = self.gallery.version
+
+        with self.metrics.timer("detect"):
+            bboxes, kpss = self.roi_detector.detect(self.models.det_model, frame,
+                                                    full_size=self.resolution.det_size)
+        tracks = self.face_tracker.update(bboxes[:, :4])
+        if not tracks:
+            # Held crops belong to faces that are gone; do not mix them into a later batch.
+            self._retry_crops.clear()
+            self._last_check_found = False
             return False
-        faces = self.app.get(frame)
-        for face in faces:
-            cur_embed = face.embedding / np.linalg.norm(face.embedding)
-            similarity = np.dot(ref_embed, cur_embed)
-            if similarity > SIMILARITY_THRESHOLD:
+
+        # A face still tracked since its last verification needs no new embedding.
+        for track in tracks:
+            if self.face_tracker.is_verified(track):
+                self.last_similarity = track.similarity
+                self._retry_crops.clear()
+                self._last_check_found = True
                 return True
+
+        crops = align_crops(frame, kpss[:len(tracks)])
+        if RECOGNITION_FRAME_BATCH > 1 and not self._last_check_found:
+            # Miss streak: hold crops until RECOGNITION_FRAME_BATCH frames share one recognition call.
+            self._retry_crops.append(crops)
+            if len(self._retry_crops) < RECOGNITION_FRAME_BATCH:
+                return None  # pending: not evidence either way
+            batch = [crop for frame_crops in self._retry_crops for crop in frame_crops]
+            self._retry_crops.clear()
+        else:
+            self._retry_crops.clear()
+            batch = crops
+
+        # All faces (and held frames) go through the recognizer as one batch.
+        with self.metrics.timer("embed"):
+            embeddings = self.models.embed_crops(batch)
+        with self.metrics.timer("match"):
+            similarity, best = self.gallery.best_match(embeddings, gallery)
+        self.last_similarity = similarity
+        found = similarity > SIMILARITY_THRESHOLD
+        offset = len(batch) - len(crops)  # the current frame's crops come last
+        if found and best >= offset:
+            self.face_tracker.mark_verified(tracks[best - offset], similarity)
+        self._last_check_found = found
+        return found
+
+    def _employee_missing(self, frame):
+        """condition_check_fn for reference mode; None while a recognition batch is pending."""
+        found = self.check_employee_in_frame(frame)
+        return None if found is None else not found
+
+    def is_face_present(self, frame):
+        """Presence mode check: detector only, no per-face heads."""
+        with self.metrics.timer("detect"):
+            return self.roi_detector.detect_presence(self.models.det_model, frame,
+                                                     full_size=self.resolution.det_size)
+
+    def _default_lock_action(self):
+        """LockWorkStation for a live camera on Windows; anything else is only logged."""
+        if sys.platform == "win32" and self.frame_source.name == "camera":
+            ctypes.windll.user32.LockWorkStation()
+            return True
+        self.logger.log_event(f"Lock requested; not locking for frame source {self.frame_source.describe()}.",
+                              level="warning")
         return False
 
-    @staticmethod
-    def lock_system():
-        ctypes.windll.user32.LockWorkStation()
+    def lock_system(self):
+        """Run the lock action; True if the session is now locked."""
+        return bool(self.lock_action())
 
     # ----------- Internal watch loop primitive -----------
 
+    def _reset_frame_state(self):
+        self.frame_gate.reset()
+        self.face_tracker.reset()
+        self.roi_detector.reset()
+        self.scheduler.reset()
+        self._retry_crops.clear()
+        self._last_check_found = True
+
+    def _preprocess_frame(self, frame):
+        """Capture stage: bring the frame down to the working resolution."""
+        size = tuple(self.resolution.frame_size)
+        if (frame.shape[1], frame.shape[0]) == size:
+            return frame  # the camera already delivers the working resolution
+        if frame.shape[1] < size[0] or frame.shape[0] < size[1]:
+            # Never upscale: captured before the camera switched to a larger
+            # level's size, and dropped by _infer_frame.
+            return frame
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _on_resolution_change(self):
+        # Boxes from the previous resolution no longer line up.
+        self.face_tracker.reset()
+        self.roi_detector.reset()
+        self.frame_gate.reset()
+        self.frame_source.request_frame_size(self.resolution.frame_size)
+        self.logger.log_event(
+            f"Resolution level {self.resolution.level}: frame {self.resolution.frame_size}, "
+            f"detector {self.resolution.det_size}."
+        )
+
+    def _infer_frame(self, frame, condition_check_fn):
+        """
+        Inference stage: gate, run the check and feed the scheduler. Returns
+        (person_missing, similarity), or None for a frame captured before a
+        resolution change or held for a recognition batch. `similarity` is None
+        unless recognition ran.
+        """
+        if self.resolution.limit_frame_size(self.frame_source.max_frame_size):
+            self._on_resolution_change()
+        if (frame.shape[1], frame.shape[0]) != tuple(self.resolution.frame_size):
+            return None
+
+        cost = None
+        margin = None
+        similarity = None
+        gate = self.frame_gate.check(frame)
+        if gate == GATE_UNCHANGED:
+            person_missing = False  # same scene as the last confident match
+            self.metrics.inc("inferences_skipped")
+        elif gate == GATE_UNUSABLE:
+            person_missing = True  # too dark/blurred to verify anyone
+            self.metrics.inc("inferences_skipped")
+            self.metrics.inc("frames_unusable")
+        else:
+            self.last_similarity = None
+            started = time.perf_counter()
+            person_missing = condition_check_fn(frame)
+            cost = time.perf_counter() - started
+            face = self.roi_detector.last_box()
+            face_height = float(face[3] - face[1]) if face is not None else None
+            if self.resolution.record(cost * 1000, face_height):
+                self._on_resolution_change()
+            if person_missing is None:
+                # Crops held for a batched recognition call: no outcome to report yet.
+                self.metrics.inc("checks_pending")
+                return None
+            similarity = self.last_similarity
+            if similarity is not None:
+                margin = similarity - SIMILARITY_THRESHOLD
+            if not person_missing:
+                self.frame_gate.mark_verified()
+        self.scheduler.record(not person_missing, cost, margin)
+        return person_missing, similarity
+
     def _face_watch_loop(self,
                          condition_check_fn,
                          alert_text,
-                         max_attempts,
+                         policy,
                          success_action_fn,
-                         failure_action_fn,
-                         delay_seconds):
-        alert_window = None
+                         failure_action_fn):
+        """
+        Decision / alert stage. Capture and inference run on the pipeline's own
+        threads; this thread feeds outcomes to `policy` and posts show/hide
+        requests to the alert overlay. Returns True once the policy decides the
+        user is absent; raises FrameSourceExhausted when a recording runs out.
+        """
+        camera_held = False
+        policy.reset()
+        miss_started = None
+        self._reset_frame_state()
+        pipeline = WatchPipeline(
+            self.logger,
+            self.frame_source,
+            preprocess_fn=self._preprocess_frame,
+            infer_fn=lambda frame: self._infer_frame(frame, condition_check_fn),
+            delay_fn=self.scheduler.next_delay,
+            metrics=self.metrics
+        )
+        self.pipeline = pipeline
+        self.decision_policy = policy
 
-        while True:
-            if self.pause_recognition.is_set():
-                if alert_window:
-                    try:
-                        alert_window.destroy()
-                    except Exception:
-                        pass
-                    alert_window = None
-                time.sleep(1)
-                continue
+        try:
+            while True:
+                if self.pause_recognition.is_set():
+                    self.alert_overlay.hide()
+                    pipeline.stop()
+                    if camera_held:
+                        self.frame_source.release()
+                        camera_held = False
+                    # Whoever unlocks may not be the person verified before the lock.
+                    self._reset_frame_state()
+                    policy.reset()
+                    miss_started = None
+                    time.sleep(1)
+                    continue
 
-            # Wait for camera to be accessible before capture
-            self.wait_for_camera()
-            cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                time.sleep(delay_seconds)
-                continue
+                if not camera_held:
+                    self.frame_source.acquire()
+                    self.frame_source.request_frame_size(self.resolution.frame_size)
+                    camera_held = True
 
-            continuous_count = 0
-            while continuous_count < max_attempts and not self.pause_recognition.is_set():
-                ret, frame = cap.read()
-                if not ret or frame is None:
-                    continue
+                if self.frame_source.exhausted:
+                    raise FrameSourceExhausted(self.frame_source.describe())
 
-                frame = cv2.resize(frame, FRAME_RESIZE)
+                # Wait for camera to be accessible before capture
+                if not self.frame_source.is_healthy():
+                    policy.reset()
+                    miss_started = None
+                    if not self.wait_for_camera():
+                        continue
+                pipeline.start()
+
+                result = pipeline.get_result()
+                if result is None:
+                    continue
 
-                if condition_check_fn(frame):  # person not found
-                    if alert_window is None:
-                        alert_window = self.create_alert_window(text=alert_text)
-                    continuous_count += 1
-                    try:
-                        alert_window.update()
-                    except Exception:
-                        alert_window = None
+                person_missing, similarity = result
+                now = time.monotonic()
+                if person_missing:
+                    self.metrics.inc("retries")
+                    if miss_started is None:
+                        miss_started = now
+                with self.metrics.timer("decision"):
+                    decision = policy.observe(not person_missing, similarity, now=now)
+                if decision in (DECISION_ABSENT, DECISION_PRESENT) and miss_started is not None:
+                    # A miss streak ended: either the user was re-verified or the lock is due.
+                    self.metrics.observe("time_to_decision", decision, now - miss_started)
+                    self.metrics.inc(f"decisions_{decision}")
+                    miss_started = None
+                if decision == DECISION_ABSENT:
+                    self.alert_overlay.hide()
+                    failure_action_fn()
+                    return True
+                if person_missing:
+                    with self.metrics.timer("alert"):
+                        self.alert_overlay.show(alert_text)
                 else:  # person found
-                    if alert_window:
-                        try:
-                            alert_window.destroy()
-                        except Exception:
-                            pass
-                        alert_window = None
-                    continuous_count = 0
+                    self.alert_overlay.hide()
                     success_action_fn()
-                    break  # exit inner loop
-
-            cap.release()
-
-            if continuous_count >= max_attempts:
-                if alert_window:
-                    try:
-                        alert_window.destroy()
-                    except Exception:
-                        pass
-                    alert_window = None
-                failure_action_fn()
-                return True
-
-            # sleep only when person found
-            time.sleep(delay_seconds)
+        finally:
+            self.alert_overlay.hide()
+            pipeline.stop()
+            if camera_held:
+                self.frame_source.release()
 
     # ----------- Public loops -----------
 
-    def recognition_loop(self, ref_embed):
+    def _run_watch(self, **kwargs):
+        """_face_watch_loop(), or None once a finite frame source has run out."""
+        try:
+            return self._face_watch_loop(**kwargs)
+        except FrameSourceExhausted as e:
+            self.logger.log_event(f"Frame source {e} has no more frames; monitoring stopped.")
+            return None
+
+    def recognition_loop(self):
+        """Returns only when a finite frame source (video, image directory) runs out."""
         alert_text = "Couldn't find employee in the frame!"
+        self.prepare_models(MODE_REFERENCE)
         while True:
             if self.pause_recognition.is_set():
                 time.sleep(1)
                 continue
 
-            failed = self._face_watch_loop(
-                condition_check_fn=lambda frame: not self.check_employee_in_frame(frame, ref_embed),
+            failed = self._run_watch(
+                condition_check_fn=self._employee_missing,
                 alert_text=alert_text,
-                max_attempts=EMPLOYEE_RETRIES,
+                policy=create_policy(),
                 success_action_fn=lambda: None,
-                failure_action_fn=lambda: None,
-                delay_seconds=5  # 5s cycle when person is present
+                failure_action_fn=lambda: None
             )
+            if failed is None:
+                return
 
             if failed:
-                self.pause_recognition.set()
-                self.logger.log_event("Employee not found after max retries. Locking system.", level="error")
-                self.lock_system()
-
-                while self.pause_recognition.is_set():
-                    time.sleep(1)
+                self.logger.log_event("Employee not found before the decision deadline. Locking system.", level="error")
+                if self.lock_system():
+                    # Resumed by the session unlock event (see _wnd_proc).
+                    self.pause_recognition.set()
+                    while self.pause_recognition.is_set():
+                        time.sleep(1)
 
     def monitor_loop(self):
+        """Returns only when a finite frame source (video, image directory) runs out."""
         alert_text = "No presence detected!"
+        self.prepare_models(MODE_PRESENCE)
         while True:
             if self.pause_recognition.is_set():
                 time.sleep(1)
                 continue
 
-            _ = self._face_watch_loop(
-                condition_check_fn=lambda frame: not bool(self.app.get(frame)),
+            failed = self._run_watch(
+                condition_check_fn=lambda frame: not self.is_face_present(frame),
                 alert_text=alert_text,
-                max_attempts=EMPLOYEE_RETRIES,
+                policy=create_policy(),
                 success_action_fn=lambda: None,
-                failure_action_fn=lambda: self.lock_system(),
-                delay_seconds=5
+                failure_action_fn=lambda: self.lock_system()
             )
+            if failed is None:
+                return
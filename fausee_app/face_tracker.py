@@ -0,0 +1,111 @@
+import time
+import threading
+from itertools import count
+
+import numpy as np
+
+from sampling_scheduler import SCHED_MAX_INTERVAL
+
+TRACK_IOU_THRESHOLD = 0.3
+TRACK_MAX_CENTROID_SHIFT = 0.5
+# Must exceed the longest sampling delay between successful checks, otherwise
+# every sample looks like a long gap and is re-embedded; the slack covers
+# capture and inference time on top of the delay.
+TRACK_GAP_SLACK_SECONDS = 5
+TRACK_MAX_GAP_SECONDS = SCHED_MAX_INTERVAL + TRACK_GAP_SLACK_SECONDS
+TRACK_RECHECK_SECONDS = 60
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    if inter <= 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+def centroid_shift(a, b):
+    """Distance between box centres relative to the diagonal of `a`."""
+    ca = np.array([(a[0] + a[2]) / 2.0, (a[1] + a[3]) / 2.0])
+    cb = np.array([(b[0] + b[2]) / 2.0, (b[1] + b[3]) / 2.0])
+    diag = np.hypot(a[2] - a[0], a[3] - a[1])
+    if diag <= 0:
+        return float("inf")
+    return float(np.linalg.norm(ca - cb) / diag)
+
+
+class Track:
+    def __init__(self, track_id, bbox, now):
+        self.id = track_id
+        self.bbox = bbox
+        self.last_seen = now
+        self.verified_at = None
+        self.similarity = None
+
+
+class FaceTracker:
+    """
+    Associates detector boxes across frames by IoU, falling back to centroid
+    distance for small faces. A track verified against the reference stays
+    verified while it keeps being detected, so its embedding is not recomputed
+    until the periodic re-check is due.
+    """
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_centroid_shift=TRACK_MAX_CENTROID_SHIFT,
+                 max_gap_seconds=TRACK_MAX_GAP_SECONDS, recheck_seconds=TRACK_RECHECK_SECONDS):
+        self.iou_threshold = iou_threshold
+        self.max_centroid_shift = max_centroid_shift
+        self.max_gap_seconds = max_gap_seconds
+        self.recheck_seconds = recheck_seconds
+        self._tracks = []
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def update(self, bboxes, now=None):
+        """Match `bboxes` (N x 4, x1 y1 x2 y2) to tracks; returns one Track per box, in order."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._tracks = [t for t in self._tracks if now - t.last_seen <= self.max_gap_seconds]
+
+            pairs = []
+            for i, box in enumerate(bboxes):
+                for j, track in enumerate(self._tracks):
+                    overlap = iou(box, track.bbox)
+                    if overlap >= self.iou_threshold:
+                        pairs.append((overlap, i, j))
+                    elif centroid_shift(track.bbox, box) <= self.max_centroid_shift:
+                        pairs.append((0.0, i, j))
+            pairs.sort(key=lambda p: p[0], reverse=True)
+
+            assigned = [None] * len(bboxes)
+            used_tracks = set()
+            for _, i, j in pairs:
+                if assigned[i] is None and j not in used_tracks:
+                    assigned[i] = self._tracks[j]
+                    used_tracks.add(j)
+
+            for i, box in enumerate(bboxes):
+                track = assigned[i]
+                if track is None:
+                    track = Track(next(self._ids), box, now)
+                    self._tracks.append(track)
+                    assigned[i] = track
+                track.bbox = box
+                track.last_seen = now
+            return assigned
+
+    def is_verified(self, track, now=None):
+        now = time.monotonic() if now is None else now
+        return track.verified_at is not None and now - track.verified_at <= self.recheck_seconds
+
+    def mark_verified(self, track, similarity, now=None):
+        with self._lock:
+            track.verified_at = time.monotonic() if now is None else now
+            track.similarity = similarity
+
+    def reset(self):
+        with self._lock:
+            self._tracks = []
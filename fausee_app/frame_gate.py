@@ -0,0 +1,86 @@
+import time
+import threading
+
+import cv2
+import numpy as np
+
+GATE_ANALYSIS_SIZE = (160, 120)
+GATE_THUMB_SIZE = (32, 24)
+GATE_MIN_BRIGHTNESS = 35
+GATE_MAX_BRIGHTNESS = 230
+GATE_MIN_SHARPNESS = 20.0
+GATE_MOTION_THRESHOLD = 6.0
+GATE_MAX_REUSE_SECONDS = 30
+
+GATE_INFER = "infer"
+GATE_UNCHANGED = "unchanged"
+GATE_UNUSABLE = "unusable"
+
+
+class FrameGate:
+    """
+    Cheap pre-inference filter. Works on a small grayscale copy of the frame:
+    - too dark / blown out (mean brightness) or too blurred (Laplacian variance)
+      -> GATE_UNUSABLE, inference would not find anyone anyway;
+    - nearly identical to the frame of the last confident verification, and that
+      verification is recent -> GATE_UNCHANGED, the previous result still holds;
+    - otherwise GATE_INFER.
+    """
+
+    def __init__(self, min_brightness=GATE_MIN_BRIGHTNESS, max_brightness=GATE_MAX_BRIGHTNESS,
+                 min_sharpness=GATE_MIN_SHARPNESS, motion_threshold=GATE_MOTION_THRESHOLD,
+                 max_reuse_seconds=GATE_MAX_REUSE_SECONDS):
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.min_sharpness = min_sharpness
+        self.motion_threshold = motion_threshold
+        self.max_reuse_seconds = max_reuse_seconds
+
+        self._lock = threading.Lock()
+        self._last_thumb = None
+        self._verified_thumb = None
+        self._verified_at = 0.0
+        self._counters = {"frames": 0, "inferred": 0, "skipped_unchanged": 0, "skipped_unusable": 0}
+
+    def check(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.resize(gray, GATE_ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+        brightness = float(gray.mean())
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        thumb = cv2.resize(gray, GATE_THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        with self._lock:
+            self._counters["frames"] += 1
+            self._last_thumb = thumb
+
+            if not (self.min_brightness <= brightness <= self.max_brightness) or sharpness < self.min_sharpness:
+                self._counters["skipped_unusable"] += 1
+                return GATE_UNUSABLE
+
+            if (self._verified_thumb is not None
+                    and time.monotonic() - self._verified_at <= self.max_reuse_seconds
+                    and float(np.abs(thumb - self._verified_thumb).mean()) < self.motion_threshold):
+                self._counters["skipped_unchanged"] += 1
+                return GATE_UNCHANGED
+
+            self._counters["inferred"] += 1
+            return GATE_INFER
+
+    def mark_verified(self):
+        """Remember the last checked frame as the reference for 'unchanged'."""
+        with self._lock:
+            if self._last_thumb is not None:
+                self._verified_thumb = self._last_thumb
+                self._verified_at = time.monotonic()
+
+    def reset(self):
+        """Forget the last verification, e.g. after a lock or a mode switch."""
+        with self._lock:
+            self._verified_thumb = None
+            self._last_thumb = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["inferences_saved"] = stats["skipped_unchanged"] + stats["skipped_unusable"]
+        return stats
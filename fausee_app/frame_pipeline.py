@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+
+from metrics import MetricsRegistry
+
+# Only the freshest preprocessed frame waits for inference; older ones are dropped.
+PIPELINE_FRAME_QUEUE_SIZE = 1
+# Decisions the alert consumer has not read yet; it drains them every poll.
+PIPELINE_RESULT_QUEUE_SIZE = 8
+PIPELINE_POLL_INTERVAL = 0.1
+PIPELINE_CAPTURE_TIMEOUT = 1.0
+
+
+class LatestQueue:
+    """
+    Bounded queue that never blocks the producer: when full, the oldest item is
+    dropped so the consumer always works on the newest data.
+    """
+
+    def __init__(self, maxsize):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self.put_count = 0
+        self.drop_count = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                self._items.popleft()
+                self.drop_count += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest pending item, or None after `timeout` seconds."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        """Drop everything pending; counted as stale drops."""
+        with self._cond:
+            self.drop_count += len(self._items)
+            self._items.clear()
+
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+    def stats(self):
+        with self._cond:
+            return {"depth": len(self._items), "put": self.put_count, "dropped": self.drop_count}
+
+
+class WatchPipeline:
+    """
+    Capture -> inference -> decision stages for the face watch loop.
+
+    The capture thread pulls frames from the frame source and preprocesses
+    them whenever the inference thread is waiting for one; the inference
+    thread runs `infer_fn` on the freshest one and then waits `delay_fn()`
+    seconds; the caller consumes the results with get_result(). `infer_fn`
+    may return None to discard a frame it considers stale.
+    """
+
+    def __init__(self, logger_manager, source, preprocess_fn, infer_fn, delay_fn,
+                 frame_queue_size=PIPELINE_FRAME_QUEUE_SIZE, result_queue_size=PIPELINE_RESULT_QUEUE_SIZE,
+                 metrics=None):
+        self.logger = logger_manager
+        self.metrics = metrics or MetricsRegistry()
+        self.source = source
+        self.preprocess_fn = preprocess_fn
+        self.infer_fn = infer_fn
+        self.delay_fn = delay_fn
+
+        self.frames = LatestQueue(frame_queue_size)
+        self.results = LatestQueue(result_queue_size)
+        self._stop = threading.Event()
+        # Set while the inference stage waits for a frame; sources only decode on demand.
+        self._frame_wanted = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._counters = {"inferences": 0, "discarded": 0, "errors": 0}
+        self._last_frame_age_ms = None
+
+    # ----------- Lifetime -----------
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_stage, daemon=True),
+            threading.Thread(target=self._inference_stage, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._frame_wanted.clear()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+        self.frames.clear()
+        self.results.clear()
+
+    def is_running(self):
+        return bool(self._threads)
+
+    # ----------- Stages -----------
+
+    def _capture_stage(self):
+        last_seq = 0
+        while not self._stop.is_set():
+            if not self._frame_wanted.wait(PIPELINE_POLL_INTERVAL):
+                continue
+            started = time.perf_counter()
+            seq, frame = self.source.get_frame(newer_than=last_seq, timeout=PIPELINE_CAPTURE_TIMEOUT)
+            if frame is None:
+                continue
+            # The source decodes on its own thread; this is how long inference waited for a frame.
+            self.metrics.observe_stage("frame_wait", time.perf_counter() - started)
+            self.metrics.inc("frames_captured")
+            last_seq = seq
+            with self.metrics.timer("resize"):
+                frame = self.preprocess_fn(frame)
+            self.frames.put((time.monotonic(), frame))
+
+    def _inference_stage(self):
+        while not self._stop.is_set():
+            if not self._frame_wanted.is_set():
+                # Anything queued was captured before the last delay.
+                self.frames.clear()
+                self._frame_wanted.set()
+            item = self.frames.get(timeout=PIPELINE_POLL_INTERVAL)
+            if item is None:
+                continue
+            self._frame_wanted.clear()
+            captured_at, frame = item
+            with self._lock:
+                self._last_frame_age_ms = (time.monotonic() - captured_at) * 1000
+            try:
+                with self.metrics.timer("inference"):
+                    result = self.infer_fn(frame)
+            except Exception as e:
+                self.logger.log_event(f"Inference stage error: {e}", level="error")
+                with self._lock:
+                    self._counters["errors"] += 1
+                self._stop.wait(1)
+                continue
+            with self._lock:
+                if result is None:
+                    self._counters["discarded"] += 1
+                    continue
+                self._counters["inferences"] += 1
+            self.metrics.inc("frames_inferred")
+            self.results.put(result)
+            # Interval chosen from recent outcomes; wakes early on stop.
+            self._stop.wait(self.delay_fn())
+
+    # ----------- Consumer side -----------
+
+    def get_result(self, timeout=PIPELINE_POLL_INTERVAL):
+        return self.results.get(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["frame_age_ms"] = self._last_frame_age_ms
+        stats["frame_queue"] = self.frames.stats()
+        stats["result_queue"] = self.results.stats()
+        return stats
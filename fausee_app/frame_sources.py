@@ -0,0 +1,380 @@
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# "camera[:index]", "video:<path>", "video-fast:<path>", "images:<dir>", "synthetic[:<face image>]".
+FRAME_SOURCE = os.environ.get("FRAME_SOURCE", "camera")
+SOURCE_BUFFER_SIZE = 3
+# Frames are only decoded while someone asked for one within this window.
+SOURCE_DEMAND_HOLD = 0.5
+# get_frame() ignores buffered frames older than this.
+SOURCE_MAX_FRAME_AGE = 0.5
+SOURCE_DEFAULT_FPS = 15
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+SYNTHETIC_FRAME_SIZE = (640, 480)
+# Synthetic face cycle, in frames: present for the first part, absent for the rest.
+SYNTHETIC_PRESENT_FRAMES = 150
+SYNTHETIC_ABSENT_FRAMES = 150
+
+
+class FrameSourceExhausted(Exception):
+    """A finite source (video file, image directory) has no more frames."""
+
+
+class FrameSource:
+    """
+    Produces frames on its own thread into a small ring buffer for as long as
+    anyone holds the source. Consumers acquire() it, pull frames with
+    get_frame() / latest_frame() and release() it; subclasses only implement
+    _run(), which loops until self._stop is set and hands frames to _publish().
+
+    Paced sources produce a frame only when a consumer asks for one, so every
+    consumer request sees the next frame of the recording and runs are
+    reproducible however slow inference is.
+    """
+
+    name = "source"
+
+    def __init__(self, logger_manager, buffer_size=SOURCE_BUFFER_SIZE, demand_hold=SOURCE_DEMAND_HOLD, metrics=None):
+        self.logger = logger_manager
+        self.demand_hold = demand_hold
+        # MetricsRegistry that receives the "capture" stage (grab + decode), if any.
+        self.metrics = metrics
+
+        self._frames = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._wanted_seq = 0
+        self._cond = threading.Condition()
+        self._users = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._healthy = False
+        self._reported_down = False
+        self._demand_until = 0.0
+        self.exhausted = False
+        # Largest (width, height) the source can deliver, once known; None = unbounded.
+        self.max_frame_size = None
+
+    def describe(self):
+        return self.name
+
+    def request_frame_size(self, size):
+        """Hint the size consumers work at; only sources that can capture at other sizes use it."""
+
+    # ----------- Lifetime -----------
+
+    def acquire(self):
+        """Register a consumer; starts the producer thread on first use."""
+        with self._cond:
+            self._users += 1
+            thread = self._thread
+            if thread is not None and thread.is_alive() and not self._stop.is_set():
+                return
+        if thread is not None:
+            # A previous release() is still shutting the old thread down.
+            thread.join()
+        with self._cond:
+            if self._thread is thread:
+                self._stop.clear()
+                self.exhausted = False  # a new producer thread starts from the beginning
+                self._thread = threading.Thread(target=self._thread_main, daemon=True)
+                self._thread.start()
+
+    def release(self):
+        """Drop a consumer; the source is closed when nobody holds it anymore."""
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            if self._users > 0:
+                return
+            self._stop.set()
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _thread_main(self):
+        try:
+            self._run()
+        finally:
+            with self._cond:
+                self._frames.clear()
+                self._healthy = False
+                self._cond.notify_all()
+
+    def _run(self):
+        raise NotImplementedError
+
+    # ----------- Health -----------
+
+    def is_healthy(self):
+        return self._healthy
+
+    def wait_until_healthy(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._healthy or self._stop.is_set(), timeout=timeout) \
+                and self._healthy
+
+    def _down_message(self):
+        return f"Frame source {self.describe()} unavailable"
+
+    def _up_message(self):
+        return f"Frame source {self.describe()} available again"
+
+    def _set_healthy(self, healthy):
+        """Caller holds self._cond."""
+        self._healthy = healthy
+        if not healthy and not self._reported_down:
+            self._reported_down = True
+            self.logger.log_event(self._down_message(), level="warning")
+        elif healthy and self._reported_down:
+            self._reported_down = False
+            self.logger.log_event(self._up_message())
+
+    # ----------- Frame access -----------
+
+    def _note_demand(self, newer_than=None):
+        """Caller holds self._cond."""
+        self._demand_until = time.monotonic() + self.demand_hold
+        if newer_than is not None and newer_than >= self._wanted_seq:
+            self._wanted_seq = newer_than + 1
+            self._cond.notify_all()
+
+    def get_frame(self, newer_than=0, timeout=1.0, max_age=SOURCE_MAX_FRAME_AGE):
+        """
+        Return (seq, frame) for the newest buffered frame with seq > newer_than
+        captured within `max_age` seconds, waiting up to `timeout` seconds.
+        Returns (newer_than, None) on timeout.
+        """
+        def fresh():
+            if not self._frames:
+                return False
+            seq, captured_at, _ = self._frames[-1]
+            return seq > newer_than and (max_age is None or time.monotonic() - captured_at <= max_age)
+
+        with self._cond:
+            self._note_demand(newer_than)
+            ready = self._cond.wait_for(lambda: fresh() or self._stop.is_set(), timeout=timeout)
+            if not ready or not fresh():
+                return newer_than, None
+            seq, _, frame = self._frames[-1]
+            return seq, frame
+
+    def latest_frame(self):
+        with self._cond:
+            self._note_demand(self._seq)
+            if not self._frames:
+                return None
+            return self._frames[-1][2]
+
+    def _wants_frame(self):
+        return time.monotonic() < self._demand_until
+
+    def _wait_for_request(self):
+        """Paced sources: block until a consumer asks for a frame we have not produced."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._wanted_seq > self._seq or self._stop.is_set())
+        return not self._stop.is_set()
+
+    def _observe_capture(self, started):
+        if self.metrics is not None:
+            self.metrics.observe_stage("capture", time.perf_counter() - started)
+
+    def _publish(self, frame):
+        with self._cond:
+            self._seq += 1
+            self._frames.append((self._seq, time.monotonic(), frame))
+            self._set_healthy(True)
+            self._cond.notify_all()
+
+    def _mark_exhausted(self):
+        with self._cond:
+            self.exhausted = True
+            self._set_healthy(False)
+            self._cond.notify_all()
+        self.logger.log_event(f"Frame source {self.describe()} reached its end.")
+
+    def stats(self):
+        return {"source": self.describe(), "frames": self._seq, "exhausted": self.exhausted}
+
+
+class _PacedSource(FrameSource):
+    """Emits frames from next_frame() either at `fps` or, with fps=None, on consumer request."""
+
+    def __init__(self, logger_manager, fps=None, loop=False, **kwargs):
+        super().__init__(logger_manager, **kwargs)
+        self.fps = fps
+        self.loop = loop
+
+    def _rewind(self):
+        """Restart from the first frame; return False if that is impossible."""
+        return False
+
+    def _next_frame(self):
+        raise NotImplementedError
+
+    def _run(self):
+        self.exhausted = False
+        self._rewind()
+        next_due = time.monotonic()
+        while not self._stop.is_set():
+            if self.fps:
+                delay = next_due - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                next_due = max(next_due + 1.0 / self.fps, time.monotonic() - 1.0)
+            elif not self._wait_for_request():
+                break
+
+            started = time.perf_counter()
+            frame = self._next_frame()
+            if frame is None and self.loop and self._rewind():
+                frame = self._next_frame()
+            if frame is None:
+                self._mark_exhausted()
+                self._stop.wait()
+                break
+            # Recordings come at their own size; consumers scale down but never up.
+            limit = self.max_frame_size or (frame.shape[1], frame.shape[0])
+            self.max_frame_size = (min(limit[0], frame.shape[1]), min(limit[1], frame.shape[0]))
+            self._observe_capture(started)
+            self._publish(frame)
+
+
+class VideoFileSource(_PacedSource):
+    """Replays a video file in real time (its own FPS) or as fast as consumers ask."""
+
+    name = "video"
+
+    def __init__(self, logger_manager, path, realtime=True, loop=False, **kwargs):
+        super().__init__(logger_manager, fps=None, loop=loop, **kwargs)
+        self.path = path
+        self.realtime = realtime
+        self._cap = None
+
+    def describe(self):
+        return f"video '{self.path}'"
+
+    def _rewind(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            return False
+        if self.realtime:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or SOURCE_DEFAULT_FPS
+        return True
+
+    def _next_frame(self):
+        ret, frame = self._cap.read() if self._cap is not None else (False, None)
+        return frame if ret else None
+
+    def _run(self):
+        try:
+            super()._run()
+        finally:
+            if self._cap is not None:
+                self._cap.release()
+                self._cap = None
+
+
+class ImageDirectorySource(_PacedSource):
+    """Serves the images of a directory in name order, at `fps` or on request."""
+
+    name = "images"
+
+    def __init__(self, logger_manager, directory, fps=None, loop=False, **kwargs):
+        super().__init__(logger_manager, fps=fps, loop=loop, **kwargs)
+        self.directory = directory
+        self._paths = []
+        self._index = 0
+
+    def describe(self):
+        return f"images '{self.directory}'"
+
+    def _rewind(self):
+        self._paths = sorted(p for p in glob.glob(os.path.join(self.directory, "*"))
+                             if p.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = 0
+        return bool(self._paths)
+
+    def _next_frame(self):
+        while self._index < len(self._paths):
+            frame = cv2.imread(self._paths[self._index])
+            self._index += 1
+            if frame is not None:
+                return frame
+        return None
+
+
+class SyntheticSource(_PacedSource):
+    """
+    Deterministic generated frames: a noisy background with, if `face_image` is
+    given, that face drifting across the frame for `present_frames` frames and
+    then gone for `absent_frames` frames. Content depends only on the frame
+    index, so runs repeat exactly.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, logger_manager, size=SYNTHETIC_FRAME_SIZE, fps=SOURCE_DEFAULT_FPS, face_image=None,
+                 present_frames=SYNTHETIC_PRESENT_FRAMES, absent_frames=SYNTHETIC_ABSENT_FRAMES, seed=0, **kwargs):
+        super().__init__(logger_manager, fps=fps, loop=True, **kwargs)
+        self.size = tuple(size)
+        self.face = cv2.imread(face_image) if face_image else None
+        if face_image and self.face is None:
+            raise ValueError(f"Cannot read synthetic face image '{face_image}'.")
+        self.present_frames = present_frames
+        self.absent_frames = absent_frames
+        self.seed = seed
+        self._index = 0
+        self._background = None
+
+    def _rewind(self):
+        self._index = 0
+        rng = np.random.default_rng(self.seed)
+        w, h = self.size
+        gradient = np.linspace(60, 160, w, dtype=np.float32)[None, :, None]
+        self._background = np.clip(gradient + rng.normal(0, 8, (h, w, 3)), 0, 255).astype(np.uint8)
+        return True
+
+    def _next_frame(self):
+        frame = self._background.copy()
+        i = self._index
+        self._index += 1
+        cycle = self.present_frames + self.absent_frames
+        if self.face is not None and (cycle == 0 or i % cycle < self.present_frames):
+            w, h = self.size
+            fh, fw = self.face.shape[:2]
+            scale = min(0.6 * h / fh, 0.6 * w / fw, 1.0)
+            face = cv2.resize(self.face, (max(1, int(fw * scale)), max(1, int(fh * scale))))
+            fh, fw = face.shape[:2]
+            x = int((w - fw) * (0.5 + 0.3 * np.sin(i / 40.0)))
+            y = int((h - fh) * (0.5 + 0.2 * np.cos(i / 55.0)))
+            frame[y:y + fh, x:x + fw] = face
+        return frame
+
+
+def create_frame_source(logger_manager, spec=FRAME_SOURCE, metrics=None):
+    """Build a frame source from a spec string (see FRAME_SOURCE)."""
+    kind, _, arg = spec.partition(":")
+    if kind == "camera":
+        from camera_service import CameraCaptureService
+        return CameraCaptureService(logger_manager, device_index=int(arg), metrics=metrics) if arg \
+            else CameraCaptureService(logger_manager, metrics=metrics)
+    if kind in ("video", "video-fast"):
+        return VideoFileSource(logger_manager, arg, realtime=(kind == "video"), metrics=metrics)
+    if kind == "images":
+        return ImageDirectorySource(logger_manager, arg, metrics=metrics)
+    if kind == "synthetic":
+        return SyntheticSource(logger_manager, face_image=arg or None, metrics=metrics)
+    raise ValueError(f"Unknown frame source '{spec}'.")
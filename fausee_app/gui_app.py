@@ -208,8 +208,10 @@ class DashboardApp(tk.Tk):
 
     def update_ref_image(self):
         # Pass self as the parent window
-        self.controller.update_reference_image(parent_window=self)
-        messagebox.showinfo("Success", "Reference image updated.")
+        if self.controller.update_reference_image(parent_window=self):
+            messagebox.showinfo("Success", "Reference image updated.")
+        else:
+            messagebox.showwarning("Reference Image", "Reference image not updated; the current one is kept.")
         self.update_status_banners()
 
     def on_close(self):
@@ -0,0 +1,318 @@
+import atexit
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+from insightface.app.common import Face
+
+from face_detection import detect_first_face
+from face_models import DET_SIZE, FaceModels, MODEL_PACK, RECOGNITION_CROP_SIZE
+from runtime_tuning import apply_process_tuning, build_session_options, report_runtime_settings
+
+# Run detection/recognition in a separate process so the GIL stays free for
+# Flask, the dashboard and the analyzer thread.
+INFERENCE_OUT_OF_PROCESS = True
+# Frames are copied into these shared-memory slots; only (slot, shape) crosses the pipe.
+INFERENCE_RING_SLOTS = 4
+INFERENCE_SLOT_BYTES = 1280 * 960 * 3
+# CPU indices for the worker process, e.g. [3]; None leaves scheduling to the OS.
+INFERENCE_WORKER_AFFINITY = None
+INFERENCE_POLL_INTERVAL = 1.0
+
+
+class SharedFrameRing:
+    """Fixed-size uint8 slots in one shared memory block, reused round-robin."""
+
+    def __init__(self, slots=INFERENCE_RING_SLOTS, slot_bytes=INFERENCE_SLOT_BYTES, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=slots * slot_bytes)
+        self._next = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def fits(self, img):
+        return img.dtype == np.uint8 and img.nbytes <= self.slot_bytes
+
+    def write(self, img):
+        slot = self._next
+        self._next = (self._next + 1) % self.slots
+        np.copyto(self.view(slot, img.shape), img)
+        return slot
+
+    def view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ----------- Worker process -----------
+
+class _ChannelLogger:
+    """
+    LoggerManager stand-in that forwards log_event() to the parent process.
+    Model heads load on several threads, so sends are serialised with the
+    replies on one lock: concurrent writes would interleave on the pipe.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.conn.send(message)
+
+    def log_event(self, message, level="info"):
+        self.send(("log", message, level))
+
+
+def _frame_from_ref(ring, ref, attached):
+    kind, key, shape = ref
+    if kind == "ring":
+        return ring.view(key, shape)
+    shm = shared_memory.SharedMemory(name=key)
+    attached.append(shm)
+    return np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _worker_main(conn, ring_name, slots, slot_bytes, pack, det_size, selection_path, cpu_affinity):
+    logger = _ChannelLogger(conn)
+    apply_process_tuning(logger, cpu_affinity=cpu_affinity)
+    models = FaceModels(logger, pack=pack, det_size=det_size)
+    # This is the process the tuning targets; the parent logs it with the first reply.
+    report_runtime_settings(logger, models.session_options, process="inference worker")
+    if selection_path:
+        from model_selection import ModelPackSelector
+        models.pack_selector = ModelPackSelector(logger, selection_path, det_size=det_size).choose
+    ring = SharedFrameRing(slots, slot_bytes, name=ring_name)
+
+    def get_faces(img, max_num):
+        return [dict(face) for face in models.get(img, max_num=max_num)]
+
+    handlers = {
+        "use_mode": lambda mode: models.use_mode(mode),
+        "ensure_mode": lambda mode: models.ensure_mode(mode),
+        "loaded_tasks": lambda: models.loaded_tasks(),
+        "model_signature": lambda: models.model_signature(),
+        "warm_up": lambda mode, det_sizes: models.warm_up(mode, det_sizes),
+        "detect": lambda img, input_size, max_num: models.det_model.detect(
+            img, input_size=input_size, max_num=max_num, metric='default'),
+        "first_face": lambda img, threshold, input_size: detect_first_face(
+            models.det_model, img, threshold=threshold, input_size=input_size),
+        "embed": lambda img, bbox, kps: models.embed(img, bbox, kps),
+        "embed_crops": lambda crops: models.embed_crops(crops),
+        "get": get_faces,
+    }
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        op, frame_ref, args = message
+        if op == "stop":
+            break
+        attached = []
+        try:
+            if frame_ref is not None:
+                args = (_frame_from_ref(ring, frame_ref, attached),) + tuple(args)
+            logger.send(("ok", handlers[op](*args)))
+        except Exception as e:
+            logger.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            for shm in attached:
+                shm.close()
+    ring.close()
+
+
+# ----------- Parent-side proxy -----------
+
+class _RemoteDetector:
+    """The slice of RetinaFace/SCRFD used by RoiDetector, executed in the worker."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def detect(self, img, input_size=None, max_num=0, metric='default'):
+        return self.client.call("detect", img, input_size, max_num)
+
+    def first_face(self, img, threshold=None, input_size=None):
+        return self.client.call("first_face", img, threshold, input_size)
+
+
+class RemoteFaceModels:
+    """
+    FaceModels look-alike backed by a worker process. Frames are handed over
+    through a SharedFrameRing; arguments and results (boxes, embeddings) are
+    small and go over a Pipe. The worker is spawned on first use and restarted
+    if it dies, re-entering the last requested mode.
+    """
+
+    def __init__(self, logger_manager, pack=MODEL_PACK, det_size=DET_SIZE, selection_path=None,
+                 slots=INFERENCE_RING_SLOTS, slot_bytes=INFERENCE_SLOT_BYTES,
+                 cpu_affinity=INFERENCE_WORKER_AFFINITY):
+        self.logger = logger_manager
+        self.pack = pack
+        self.det_size = det_size
+        self.selection_path = selection_path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.cpu_affinity = cpu_affinity
+        # The worker builds identical options from runtime_tuning; kept for reporting.
+        self.session_options = build_session_options()
+
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._ring = None
+        self._mode = None
+        self._atexit_registered = False
+
+    # ----------- Lifetime -----------
+
+    def _start_locked(self):
+        ctx = multiprocessing.get_context("spawn")
+        if self._ring is None:
+            self._ring = SharedFrameRing(self.slots, self.slot_bytes)
+        if self._conn is not None:
+            self._conn.close()
+        parent_conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._ring.name, self.slots, self.slot_bytes, self.pack, self.det_size,
+                  self.selection_path, self.cpu_affinity),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+        self.logger.log_event(f"Inference worker started (pid {self._process.pid}).")
+        if self._mode is not None:
+            self._request_locked("use_mode", None, (self._mode,))
+
+    def _ensure_started_locked(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        if self._process is not None:
+            self.logger.log_event(
+                f"Inference worker exited (code {self._process.exitcode}); restarting.", level="error"
+            )
+        self._start_locked()
+
+    def close(self):
+        with self._lock:
+            if self._process is not None:
+                try:
+                    if self._process.is_alive():
+                        self._conn.send(("stop", None, ()))
+                    self._process.join(timeout=5)
+                    if self._process.is_alive():
+                        self._process.terminate()
+                except (OSError, ValueError):
+                    pass
+                self._conn.close()
+                self._process = None
+            if self._ring is not None:
+                self._ring.close(unlink=True)
+                self._ring = None
+
+    def is_running(self):
+        return self._process is not None and self._process.is_alive()
+
+    # ----------- Transport -----------
+
+    def _frame_ref_locked(self, img):
+        """
+        Place `img` where the worker can read it without pickling. Every call
+        copies the pixels: callers may modify an array in place between calls,
+        so reusing a slot by object identity could hand the worker stale data.
+        """
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        if self._ring.fits(img):
+            slot = self._ring.write(img)
+            return ("ring", slot, img.shape), None
+        # Larger than a slot (e.g. a full-size enrollment photo): one-off segment.
+        shm = shared_memory.SharedMemory(create=True, size=img.nbytes)
+        np.ndarray(img.shape, dtype=np.uint8, buffer=shm.buf)[...] = img
+        return ("shm", shm.name, img.shape), shm
+
+    def _request_locked(self, op, img, args):
+        oversize = None
+        frame_ref = None
+        if img is not None:
+            frame_ref, oversize = self._frame_ref_locked(img)
+        try:
+            self._conn.send((op, frame_ref, args))
+            while True:
+                if not self._conn.poll(INFERENCE_POLL_INTERVAL):
+                    if not self._process.is_alive():
+                        raise RuntimeError(f"Inference worker died during '{op}'.")
+                    continue
+                reply = self._conn.recv()
+                if reply[0] == "log":
+                    self.logger.log_event(reply[1], level=reply[2])
+                    continue
+                status, payload = reply
+                if status == "error":
+                    raise RuntimeError(f"Inference worker '{op}' failed: {payload}")
+                return payload
+        finally:
+            if oversize is not None:
+                oversize.close()
+                oversize.unlink()
+
+    def call(self, op, img=None, *args):
+        with self._lock:
+            self._ensure_started_locked()
+            return self._request_locked(op, img, args)
+
+    # ----------- FaceModels interface -----------
+
+    def use_mode(self, mode):
+        with self._lock:
+            self._mode = mode
+            if self.is_running():
+                self._request_locked("use_mode", None, (mode,))
+            else:
+                self._ensure_started_locked()  # replays self._mode on start
+
+    def ensure_mode(self, mode):
+        self.call("ensure_mode", None, mode)
+
+    def loaded_tasks(self):
+        return self.call("loaded_tasks")
+
+    def model_signature(self):
+        return self.call("model_signature")
+
+    def warm_up(self, mode, det_sizes=()):
+        """Runs in the worker; the sessions it warms are the ones that serve frames."""
+        return self.call("warm_up", None, mode, list(det_sizes))
+
+    @property
+    def det_model(self):
+        return _RemoteDetector(self)
+
+    def detect(self, img, max_num=0):
+        return self.call("detect", img, None, max_num)
+
+    def embed(self, img, bbox, kps):
+        return self.call("embed", img, bbox, kps)
+
+    def embed_crops(self, crops):
+        """Crops are stacked into one array so the whole batch shares a ring slot."""
+        return self.call("embed_crops", np.stack(list(crops)) if len(crops) else
+                         np.zeros((0, RECOGNITION_CROP_SIZE, RECOGNITION_CROP_SIZE, 3), dtype=np.uint8))
+
+    def get(self, img, max_num=0):
+        return [Face(d=face) for face in self.call("get", img, max_num)]
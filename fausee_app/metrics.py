@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_PREFIX = "fausee"
+# Upper bounds (seconds) of the hot-path latency histograms.
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Upper bounds (seconds) of the first-miss-to-decision histograms.
+DECISION_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# Counters whose recent per-second rate is reported (e.g. frames/s).
+RATE_COUNTERS = ("frames_captured", "frames_inferred")
+RATE_WINDOW_SECONDS = 10.0
+
+HISTOGRAM_HELP = {
+    "stage": "Hot-path latency per pipeline stage.",
+    "time_to_decision": "Time from the first miss to a present/absent decision.",
+}
+HISTOGRAM_LABEL = {
+    "stage": "stage",
+    "time_to_decision": "outcome",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket, cumulated on export."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Bucket-interpolated estimate; None without samples."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if n and seen + n >= target:
+                return lower + (upper - lower) * (target - seen) / n
+            seen += n
+            lower = upper
+        return self.buckets[-1]
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms for the recognition hot path, exported
+    as Prometheus text or JSON. Timers use time.perf_counter and take one lock
+    per observation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._events = {name: deque() for name in RATE_COUNTERS}
+        self._started = time.monotonic()
+
+    def _histogram(self, metric, label):
+        key = (metric, label)
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = Histogram(DECISION_BUCKETS if metric == "time_to_decision"
+                                                     else STAGE_BUCKETS)
+        return hist
+
+    def observe(self, metric, label, seconds):
+        with self._lock:
+            self._histogram(metric, label).observe(seconds)
+
+    def observe_stage(self, stage, seconds):
+        self.observe("stage", stage, seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage", stage, time.perf_counter() - start)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+            events = self._events.get(name)
+            if events is not None:
+                now = time.monotonic()
+                events.append(now)
+                while events and now - events[0] > RATE_WINDOW_SECONDS:
+                    events.popleft()
+
+    def _rates(self):
+        now = time.monotonic()
+        window = min(RATE_WINDOW_SECONDS, max(now - self._started, 1e-6))
+        return {name: sum(1 for t in events if now - t <= window) / window
+                for name, events in self._events.items()}
+
+    # ----------- Export -----------
+
+    def to_json(self):
+        with self._lock:
+            histograms = {}
+            for (metric, label), hist in sorted(self._histograms.items()):
+                histograms.setdefault(metric, {})[label] = {
+                    "count": hist.count,
+                    "sum": hist.sum,
+                    "mean": hist.sum / hist.count if hist.count else None,
+                    "p50": hist.quantile(0.5),
+                    "p95": hist.quantile(0.95),
+                    "buckets": {("+Inf" if bound == float("inf") else str(bound)): n
+                                for bound, n in hist.cumulative()},
+                }
+            return {
+                "uptime_seconds": time.monotonic() - self._started,
+                "counters": dict(self._counters),
+                "rates_per_second": self._rates(),
+                "histograms": histograms,
+            }
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            by_metric = {}
+            for (metric, label), hist in sorted(self._histograms.items()):
+                by_metric.setdefault(metric, []).append((label, hist))
+            for metric, entries in by_metric.items():
+                name = f"{METRICS_PREFIX}_{metric}_seconds"
+                label_name = HISTOGRAM_LABEL.get(metric, "name")
+                lines.append(f"# HELP {name} {HISTOGRAM_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {name} histogram")
+                for label, hist in entries:
+                    for bound, n in hist.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{label_name}="{label}",le="{le}"}} {n}')
+                    lines.append(f'{name}_sum{{{label_name}="{label}"}} {hist.sum}')
+                    lines.append(f'{name}_count{{{label_name}="{label}"}} {hist.count}')
+            for counter, value in sorted(self._counters.items()):
+                name = f"{METRICS_PREFIX}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+            for counter, rate in sorted(self._rates().items()):
+                name = f"{METRICS_PREFIX}_{counter}_per_second"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {rate}")
+        return "\n".join(lines) + "\n"
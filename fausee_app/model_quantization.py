@@ -0,0 +1,134 @@
+"""
+Builds INT8 variants of the detector and recognizer of a buffalo pack.
+
+    python model_quantization.py --method dynamic
+    python model_quantization.py --method static --calibration-dir C:\\calib_images
+
+Variants are written next to the pack (`<pack>/quantized/<model>.<precision>.onnx`)
+and picked up by FaceModels when MODEL_PRECISION selects them.
+"""
+import argparse
+import glob
+import os
+
+import cv2
+import onnxruntime
+from insightface.model_zoo import RetinaFace
+from insightface.utils import ensure_available, face_align
+from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic,
+                                      quantize_static)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from face_detection import letterbox
+from face_models import (DET_SIZE, MODEL_PACK, MODEL_ROOT, PRECISION_INT8_DYNAMIC, PRECISION_INT8_STATIC,
+                         TASK_FILE_PATTERNS, variant_path)
+
+CALIBRATION_IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
+CALIBRATION_MAX_IMAGES = 200
+REC_INPUT_SIZE = 112
+
+
+def list_images(folder, limit=CALIBRATION_MAX_IMAGES):
+    paths = []
+    for pattern in CALIBRATION_IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(folder, pattern)))
+    return sorted(paths)[:limit]
+
+
+def detector_blob(img, input_size):
+    det_img, _ = letterbox(img, input_size)
+    return cv2.dnn.blobFromImage(det_img, 1.0 / 128.0, input_size, (127.5, 127.5, 127.5), swapRB=True)
+
+
+def recognizer_blob(aligned):
+    return cv2.dnn.blobFromImages([aligned], 1.0 / 127.5, (REC_INPUT_SIZE, REC_INPUT_SIZE),
+                                  (127.5, 127.5, 127.5), swapRB=True)
+
+
+def aligned_faces(images, det_model):
+    """Aligned 112x112 crops, the exact input the recognizer sees at runtime."""
+    crops = []
+    for img in images:
+        bboxes, kpss = det_model.detect(img, max_num=1, metric='default')
+        if bboxes.shape[0] and kpss is not None:
+            crops.append(face_align.norm_crop(img, landmark=kpss[0], image_size=REC_INPUT_SIZE))
+    return crops
+
+
+class BlobCalibrationReader(CalibrationDataReader):
+    """Feeds precomputed input blobs to onnxruntime's static calibration."""
+
+    def __init__(self, input_name, blobs):
+        self.input_name = input_name
+        self._blobs = iter(blobs)
+
+    def get_next(self):
+        blob = next(self._blobs, None)
+        return None if blob is None else {self.input_name: blob}
+
+
+def model_input_name(model_file):
+    session = onnxruntime.InferenceSession(model_file, providers=["CPUExecutionProvider"])
+    return session.get_inputs()[0].name
+
+
+def quantize_model(model_file, method, blobs=None):
+    """Write the INT8 variant of `model_file` and return its path."""
+    if method == "dynamic":
+        output_file = variant_path(model_file, PRECISION_INT8_DYNAMIC)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        quantize_dynamic(model_file, output_file, weight_type=QuantType.QInt8)
+        return output_file
+
+    if not blobs:
+        raise ValueError("Static quantization needs calibration data; check --calibration-dir.")
+    output_file = variant_path(model_file, PRECISION_INT8_STATIC)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    preprocessed = output_file + ".pre.onnx"
+    quant_pre_process(model_file, preprocessed)
+    try:
+        quantize_static(
+            preprocessed, output_file,
+            BlobCalibrationReader(model_input_name(model_file), blobs),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+        )
+    finally:
+        os.remove(preprocessed)
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pack", default=MODEL_PACK)
+    parser.add_argument("--root", default=MODEL_ROOT)
+    parser.add_argument("--method", choices=("dynamic", "static"), default="dynamic")
+    parser.add_argument("--calibration-dir", help="Folder of face images (required for --method static)")
+    parser.add_argument("--tasks", nargs="+", default=["detection", "recognition"], choices=list(TASK_FILE_PATTERNS))
+    args = parser.parse_args()
+
+    model_dir = ensure_available('models', args.pack, root=args.root)
+    model_files = {task: sorted(glob.glob(os.path.join(model_dir, TASK_FILE_PATTERNS[task])))[0] for task in args.tasks}
+
+    blobs = {}
+    if args.method == "static":
+        if not args.calibration_dir:
+            parser.error("--calibration-dir is required for static quantization")
+        images = [img for img in (cv2.imread(p) for p in list_images(args.calibration_dir)) if img is not None]
+        det_file = sorted(glob.glob(os.path.join(model_dir, TASK_FILE_PATTERNS["detection"])))[0]
+        det_model = RetinaFace(model_file=det_file)
+        det_model.prepare(0, input_size=DET_SIZE)
+        blobs["detection"] = [detector_blob(img, DET_SIZE) for img in images]
+        blobs["recognition"] = [recognizer_blob(crop) for crop in aligned_faces(images, det_model)]
+        print(f"Calibration: {len(images)} images, {len(blobs['recognition'])} aligned faces")
+
+    for task, model_file in model_files.items():
+        output_file = quantize_model(model_file, args.method, blobs.get(task))
+        size_mb = os.path.getsize(output_file) / 2**20
+        print(f"{task}: {os.path.basename(model_file)} -> {output_file} ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import numpy as np
+from insightface.utils.face_align import arcface_dst
+
+from face_models import DET_SIZE, FaceModels, MODE_REFERENCE, RECOGNITION_CROP_SIZE
+from resolution_controller import INFERENCE_BUDGET_MS, RESOLUTION_LEVELS, level_for_det_size
+
+# Most accurate first; the first pack that fits the budget wins.
+MODEL_PACK_CANDIDATES = ["buffalo_l", "buffalo_m", "buffalo_s", "buffalo_sc"]
+PACK_BENCHMARK_RUNS = 10
+PACK_SELECTION_FILE = "model_selection.json"
+# Side of the synthetic face placed in the middle of the benchmark frame.
+BENCHMARK_FACE_SIZE = 224
+
+
+def _cpu_signature():
+    return f"{platform.machine()}|{platform.processor()}|{os.cpu_count()}"
+
+
+def benchmark_pack(logger_manager, pack, det_size=DET_SIZE, runs=PACK_BENCHMARK_RUNS):
+    """
+    Median ms for one detector pass plus one embedding on a synthetic frame of
+    the size the watch loop starts at for `det_size`.
+    """
+    models = FaceModels(logger_manager, pack=pack, det_size=det_size)
+    models.ensure_mode(MODE_REFERENCE)
+
+    frame_w, frame_h = RESOLUTION_LEVELS[level_for_det_size(det_size)][0]
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, size=(frame_h, frame_w, 3), dtype=np.uint8)
+    # Canonical ArcFace landmarks scaled into the frame give the recognizer a valid crop.
+    x, y = (frame_w - BENCHMARK_FACE_SIZE) / 2.0, (frame_h - BENCHMARK_FACE_SIZE) / 2.0
+    kps = arcface_dst * (BENCHMARK_FACE_SIZE / float(RECOGNITION_CROP_SIZE)) + np.array([x, y], dtype=np.float32)
+    bbox = np.array([x, y, x + BENCHMARK_FACE_SIZE, y + BENCHMARK_FACE_SIZE], dtype=np.float32)
+
+    def one_frame():
+        models.detect(frame)
+        models.embed(frame, bbox, kps)
+
+    one_frame()  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        one_frame()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+class ModelPackSelector:
+    """
+    Picks the most accurate candidate pack whose per-frame latency fits the
+    budget on this machine, and remembers the choice so the benchmark only runs
+    again when the CPU, budget, candidates or detector size change.
+    """
+
+    def __init__(self, logger_manager, settings_path, candidates=None,
+                 budget_ms=INFERENCE_BUDGET_MS, det_size=DET_SIZE):
+        self.logger = logger_manager
+        self.settings_path = settings_path
+        self.candidates = list(candidates or MODEL_PACK_CANDIDATES)
+        self.budget_ms = budget_ms
+        self.det_size = tuple(det_size)
+
+    def _key(self):
+        return {
+            "cpu": _cpu_signature(),
+            "budget_ms": self.budget_ms,
+            "candidates": self.candidates,
+            "det_size": list(self.det_size),
+        }
+
+    def load_saved(self):
+        try:
+            with open(self.settings_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("key") != self._key() or saved.get("pack") not in self.candidates:
+            return None
+        return saved["pack"]
+
+    def _save(self, pack, results):
+        data = {
+            "pack": pack,
+            "key": self._key(),
+            "results_ms": results,
+            "measured_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.settings_path)), exist_ok=True)
+        tmp_path = self.settings_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.settings_path)
+
+    def choose(self):
+        pack = self.load_saved()
+        if pack:
+            self.logger.log_event(f"Using saved model pack selection: {pack}.")
+            return pack
+
+        self.logger.log_event(
+            f"Benchmarking model packs {self.candidates} against a {self.budget_ms} ms/frame budget."
+        )
+        results = {}
+        for candidate in self.candidates:
+            try:
+                results[candidate] = benchmark_pack(self.logger, candidate, self.det_size)
+            except Exception as e:
+                self.logger.log_event(f"Model pack '{candidate}' could not be benchmarked: {e}", level="warning")
+                continue
+            self.logger.log_event(f"Model pack '{candidate}': {results[candidate]:.1f} ms/frame.")
+            if results[candidate] <= self.budget_ms:
+                pack = candidate
+                break
+
+        if pack is None:
+            if not results:
+                raise RuntimeError("No model pack could be loaded.")
+            pack = min(results, key=results.get)
+            self.logger.log_event(
+                f"No model pack fits {self.budget_ms} ms/frame; falling back to the fastest: {pack}.",
+                level="warning"
+            )
+        else:
+            self.logger.log_event(f"Selected model pack '{pack}' ({results[pack]:.1f} ms/frame).")
+
+        self._save(pack, results)
+        return pack
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import platform
+import threading
+
+import onnxruntime
+
+from runtime_tuning import ORT_GRAPH_OPTIMIZATION, build_session_options
+
+OPTIMIZED_MODEL_CACHE = True
+OPTIMIZED_MODEL_DIR = os.path.join("~", ".insightface", "optimized")
+# Source-file digests, reused while a model's size and mtime are unchanged.
+MODEL_HASHES_FILE = "model_hashes.json"
+
+_hash_lock = threading.Lock()
+
+
+def _atomic_write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def model_digest(model_file, cache_dir):
+    """sha256 of the model file; only re-hashed when its size or mtime changes."""
+    model_file = os.path.abspath(model_file)
+    stat = os.stat(model_file)
+    memo_path = os.path.join(cache_dir, MODEL_HASHES_FILE)
+    with _hash_lock:
+        try:
+            with open(memo_path, "r", encoding="utf-8") as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            memo = {}
+        entry = memo.get(model_file)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        sha = hashlib.sha256()
+        with open(model_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        memo[model_file] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _atomic_write_json(memo_path, memo)
+        except OSError:
+            pass
+        return digest
+
+
+def optimized_model_path(model_file, cache_dir, providers, graph_optimization=ORT_GRAPH_OPTIMIZATION):
+    """
+    Cache location for `model_file` optimized by this ORT build. The name hashes
+    the model digest, ORT version, optimization level, providers and CPU, so a
+    change to any of them misses and the graph is optimized again.
+    """
+    key = "|".join([
+        model_digest(model_file, cache_dir),
+        onnxruntime.__version__,
+        graph_optimization,
+        ",".join(providers),
+        platform.machine(),
+        platform.processor(),
+    ])
+    stem = os.path.splitext(os.path.basename(model_file))[0]
+    return os.path.join(cache_dir, f"{stem}.{hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]}.onnx")
+
+
+def _remove_stale(cached_path):
+    """Drop other cached optimizations of the same model file."""
+    directory, cached_name = os.path.split(cached_path)
+    stem = cached_name.rsplit(".", 2)[0]
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        key = name[len(stem) + 1:-len(".onnx")]
+        if name != cached_name and name.startswith(f"{stem}.") and name.endswith(".onnx") \
+                and len(key) == 20 and "." not in key:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def create_session(logger_manager, model_file, providers, cache_dir=OPTIMIZED_MODEL_DIR,
+                   graph_optimization=ORT_GRAPH_OPTIMIZATION):
+    """
+    InferenceSession for `model_file` that skips ORT's graph optimizations when a
+    previous run already saved the optimized graph. On a miss the session is
+    created normally with optimized_model_filepath set, and the written graph is
+    moved into the cache atomically for the next start.
+    """
+    cache_dir = os.path.expanduser(cache_dir)
+    name = os.path.basename(model_file)
+    try:
+        cached_path = optimized_model_path(model_file, cache_dir, providers, graph_optimization)
+    except OSError as e:
+        logger_manager.log_event(f"Optimized model cache unavailable for '{name}': {e}", level="warning")
+        return onnxruntime.InferenceSession(model_file, sess_options=build_session_options(), providers=providers)
+
+    if os.path.exists(cached_path):
+        try:
+            options = build_session_options(graph_optimization="disable")
+            session = onnxruntime.InferenceSession(cached_path, sess_options=options, providers=providers)
+            logger_manager.log_event(f"Loaded pre-optimized '{name}' from cache.")
+            return session
+        except Exception as e:
+            logger_manager.log_event(f"Discarding unusable optimized '{name}': {e}", level="warning")
+            try:
+                os.remove(cached_path)
+            except OSError:
+                pass
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{os.path.splitext(cached_path)[0]}.{os.getpid()}.{threading.get_ident()}.tmp"
+    options = build_session_options(graph_optimization=graph_optimization)
+    options.optimized_model_filepath = tmp_path
+    try:
+        session = onnxruntime.InferenceSession(model_file, sess_options=options, providers=providers)
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, cached_path)
+            _remove_stale(cached_path)
+            logger_manager.log_event(f"Cached optimized '{name}' for later starts.")
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return session
@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+
+
+class ReferenceGallery:
+    """
+    Enrollment embeddings of the authorised user as one (k x d) matrix.
+
+    The matrix is never modified in place: updates build a new array and publish
+    it with a single reference assignment, so a running recognition loop always
+    scores against a complete gallery and picks up a new one on its next frame.
+    """
+
+    def __init__(self, embeddings=None):
+        self._write_lock = threading.Lock()
+        self._matrix = None
+        self.version = 0
+        if embeddings is not None:
+            self.swap(embeddings)
+
+    @staticmethod
+    def _normalize(embeddings):
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def swap(self, embeddings):
+        """Atomically replace the whole gallery; None or empty clears it."""
+        matrix = None
+        if embeddings is not None and len(embeddings):
+            matrix = self._normalize(embeddings)
+            matrix.setflags(write=False)
+        with self._write_lock:
+            self._matrix = matrix
+            self.version += 1
+
+    def add(self, embedding):
+        with self._write_lock:
+            new_row = self._normalize(embedding)
+            matrix = new_row if self._matrix is None else np.vstack([self._matrix, new_row])
+            matrix.setflags(write=False)
+            self._matrix = matrix
+            self.version += 1
+
+    def snapshot(self):
+        """Current gallery matrix (read-only) or None when nothing is enrolled."""
+        return self._matrix
+
+    def size(self):
+        matrix = self._matrix
+        return 0 if matrix is None else matrix.shape[0]
+
+    def best_match(self, embeddings, gallery=None):
+        """
+        Score every face against every enrollment in one matrix product.
+        Returns (best similarity, index of the face that produced it), or
+        (None, None) if there is nothing to compare.
+        """
+        gallery = self._matrix if gallery is None else gallery
+        if gallery is None or len(embeddings) == 0:
+            return None, None
+        scores = np.atleast_2d(embeddings) @ gallery.T
+        per_face = scores.max(axis=1)
+        best = int(per_face.argmax())
+        return float(per_face[best]), best
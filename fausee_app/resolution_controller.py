@@ -0,0 +1,199 @@
+import threading
+
+# (frame size, detector input size), cheapest first. The controller starts at the
+# level matching face_models.DET_SIZE, so that setting still picks the working size.
+RESOLUTION_LEVELS = [
+    ((320, 240), (160, 160)),
+    ((480, 360), (256, 256)),
+    ((640, 480), (320, 320)),
+    ((960, 720), (480, 480)),
+    ((1280, 960), (640, 640)),
+]
+RESOLUTION_ADAPTIVE = True
+RESOLUTION_MIN_LEVEL = 0
+RESOLUTION_MAX_LEVEL = 4
+# Per-frame inference budget; model_selection picks the pack against the same figure.
+INFERENCE_BUDGET_MS = 120
+# Climb back towards the start level only with this much headroom (fraction of budget).
+RESOLUTION_HEADROOM = 0.5
+# Consecutive samples that must agree before the level changes.
+RESOLUTION_HYSTERESIS = 5
+RESOLUTION_LATENCY_SMOOTHING = 0.3
+# Face height, in detector-input pixels, below which detection gets unreliable.
+MIN_FACE_PIXELS = 32
+
+
+def level_for_det_size(det_size, levels=None):
+    """Index of the level whose detector input is closest in area to `det_size`."""
+    levels = levels or RESOLUTION_LEVELS
+    area = det_size[0] * det_size[1]
+    return min(range(len(levels)), key=lambda i: abs(levels[i][1][0] * levels[i][1][1] - area))
+
+
+class ResolutionController:
+    """
+    Steps frame resolution and detector input size within configured bounds so
+    per-frame inference stays inside a latency budget. The apparent face size
+    vetoes steps that would shrink a distant face below MIN_FACE_PIXELS, and
+    asks for a higher level when the face is already that small.
+
+    `start_level` defaults to the level matching face_models.DET_SIZE.
+    """
+
+    def __init__(self, adaptive=RESOLUTION_ADAPTIVE, levels=None, start_level=None, min_level=RESOLUTION_MIN_LEVEL,
+                 max_level=RESOLUTION_MAX_LEVEL, budget_ms=INFERENCE_BUDGET_MS, headroom=RESOLUTION_HEADROOM,
+                 hysteresis=RESOLUTION_HYSTERESIS, smoothing=RESOLUTION_LATENCY_SMOOTHING,
+                 min_face_pixels=MIN_FACE_PIXELS):
+        self.adaptive = adaptive
+        self.levels = levels or RESOLUTION_LEVELS
+        self.min_level = max(0, min_level)
+        self.max_level = min(len(self.levels) - 1, max_level)
+        if start_level is None:
+            from face_models import DET_SIZE
+            start_level = level_for_det_size(DET_SIZE, self.levels)
+        self.start_level = min(max(start_level, self.min_level), self.max_level)
+        self.budget_ms = budget_ms
+        self.headroom = headroom
+        self.hysteresis = hysteresis
+        self.smoothing = smoothing
+        self.min_face_pixels = min_face_pixels
+
+        self._lock = threading.Lock()
+        self.level = self.start_level
+        self._latency_ms = None
+        self._face_pixels = None
+        self._pending = 0
+        self._votes = 0
+
+    @property
+    def frame_size(self):
+        return self.levels[self.level][0]
+
+    @property
+    def det_size(self):
+        return self.levels[self.level][1]
+
+    def det_sizes(self):
+        """Every detector input size this controller may switch to."""
+        if not self.adaptive:
+            return [self.det_size]
+        return [det for _, det in self.levels[self.min_level:self.max_level + 1]]
+
+    def _det_scale(self, level):
+        (frame_w, frame_h), (det_w, det_h) = self.levels[level]
+        return min(float(det_w) / frame_w, float(det_h) / frame_h)
+
+    def _cost_ratio(self, from_level, to_level):
+        """Detector cost grows roughly with the number of input pixels."""
+        (w0, h0), (w1, h1) = self.levels[from_level][1], self.levels[to_level][1]
+        return float(w1 * h1) / (w0 * h0)
+
+    def _face_pixels_at(self, level):
+        """Face height in detector pixels if we were running at `level`."""
+        if self._face_pixels is None:
+            return None
+        frame_h_now = self.levels[self.level][0][1]
+        frame_h = self.levels[level][0][1]
+        return self._face_pixels / self._det_scale(self.level) * frame_h / frame_h_now * self._det_scale(level)
+
+    def _wanted_step(self):
+        latency = self._latency_ms
+        if latency is None:
+            return 0
+        face_now = self._face_pixels_at(self.level)
+
+        if latency > self.budget_ms and self.level > self.min_level:
+            face_down = self._face_pixels_at(self.level - 1)
+            if face_down is None or face_down >= self.min_face_pixels:
+                return -1
+            return 0
+
+        if self.level < self.max_level:
+            predicted = latency * self._cost_ratio(self.level, self.level + 1)
+            if face_now is not None and face_now < self.min_face_pixels and predicted <= self.budget_ms:
+                return 1
+            if self.level < self.start_level and predicted <= self.budget_ms * self.headroom:
+                return 1
+
+        if self.level > self.start_level:
+            # Above the default only while a small face needs it.
+            face_down = self._face_pixels_at(self.level - 1)
+            if face_down is None or face_down >= self.min_face_pixels * 1.5:
+                return -1
+        return 0
+
+    def record(self, inference_ms, face_height=None):
+        """
+        Feed one inference measurement; `face_height` is the largest face box
+        height in frame pixels, if any. Returns True when the level changed.
+        """
+        with self._lock:
+            if self._latency_ms is None:
+                self._latency_ms = inference_ms
+            else:
+                self._latency_ms += self.smoothing * (inference_ms - self._latency_ms)
+            if face_height is not None:
+                self._face_pixels = face_height * self._det_scale(self.level)
+
+            step = self._wanted_step() if self.adaptive else 0
+            if step == 0 or step != self._pending:
+                self._pending = step
+                self._votes = 1 if step else 0
+                return False
+            self._votes += 1
+            if self._votes < self.hysteresis:
+                return False
+
+            old_level = self.level
+            self.level += step
+            if self._face_pixels is not None:
+                self._face_pixels = self._face_pixels * self._det_scale(self.level) / self._det_scale(old_level) \
+                    * self.levels[self.level][0][1] / self.levels[old_level][0][1]
+            # The new level has a different cost; let the average re-settle.
+            self._latency_ms = self._latency_ms * self._cost_ratio(old_level, self.level)
+            self._pending = 0
+            self._votes = 0
+            return True
+
+    def limit_frame_size(self, size):
+        """
+        Cap the levels at frames no larger than `size`, what the source can
+        deliver, so frames are never upscaled. Returns True when the level changed.
+        """
+        if size is None:
+            return False
+        with self._lock:
+            fitting = [i for i, (frame, _) in enumerate(self.levels)
+                       if frame[0] <= size[0] and frame[1] <= size[1]]
+            max_level = max(self.min_level, fitting[-1] if fitting else self.min_level)
+            if max_level >= self.max_level:
+                return False
+            self.max_level = max_level
+            self.start_level = min(self.start_level, max_level)
+            if self.level <= max_level:
+                return False
+            self.level = max_level
+            self._latency_ms = None
+            self._face_pixels = None
+            self._pending = 0
+            self._votes = 0
+            return True
+
+    def reset(self):
+        """Back to the start level, e.g. after a model or camera change."""
+        with self._lock:
+            self.level = self.start_level
+            self._latency_ms = None
+            self._face_pixels = None
+            self._pending = 0
+            self._votes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "level": self.level,
+                "frame_size": list(self.frame_size),
+                "det_size": list(self.det_size),
+                "latency_ms": self._latency_ms,
+                "face_pixels": self._face_pixels,
+            }
@@ -0,0 +1,127 @@
+import threading
+
+import numpy as np
+
+from face_detection import detect_first_face
+
+ROI_ENABLED = True
+# The crop extends the last face box by this fraction of its width/height on every side.
+ROI_EXPANSION = 1.0
+ROI_DET_SIZE = (160, 160)
+# Force a full-frame scan after this many ROI-only frames, so new faces are noticed.
+ROI_REFRESH_FRAMES = 20
+ROI_MIN_CROP = 96
+
+
+def _first_face(det_model, img, input_size):
+    # Out-of-process detectors (inference_worker) run the fast path on their side.
+    first_face = getattr(det_model, "first_face", None)
+    if first_face is not None:
+        return first_face(img, input_size=input_size)
+    return detect_first_face(det_model, img, input_size=input_size)
+
+
+class RoiDetector:
+    """
+    Runs the detector on an expanded crop around the last detected face at a
+    reduced input size, and falls back to the full frame on a miss or every
+    `refresh_frames` frames. Results are always in full-frame coordinates.
+    """
+
+    def __init__(self, enabled=ROI_ENABLED, expansion=ROI_EXPANSION, det_size=ROI_DET_SIZE,
+                 refresh_frames=ROI_REFRESH_FRAMES, min_crop=ROI_MIN_CROP):
+        self.enabled = enabled
+        self.expansion = expansion
+        self.det_size = det_size
+        self.refresh_frames = refresh_frames
+        self.min_crop = min_crop
+
+        self._lock = threading.Lock()
+        self._last_box = None
+        self._roi_frames = 0
+        self._counters = {"roi_hits": 0, "roi_misses": 0, "full_scans": 0}
+
+    def _region(self, frame_shape):
+        """Crop rectangle around the last box, or None if a full scan is due."""
+        with self._lock:
+            box = self._last_box
+            if not self.enabled or box is None or self._roi_frames >= self.refresh_frames:
+                return None
+        h, w = frame_shape[:2]
+        bw, bh = box[2] - box[0], box[3] - box[1]
+        half_w = max(bw * (0.5 + self.expansion), self.min_crop / 2.0)
+        half_h = max(bh * (0.5 + self.expansion), self.min_crop / 2.0)
+        cx, cy = (box[0] + box[2]) / 2.0, (box[1] + box[3]) / 2.0
+        x0, y0 = int(max(0, cx - half_w)), int(max(0, cy - half_h))
+        x1, y1 = int(min(w, cx + half_w)), int(min(h, cy + half_h))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    def _remember(self, box, used_roi):
+        with self._lock:
+            self._last_box = None if box is None else np.asarray(box[:4], dtype=np.float32)
+            if used_roi:
+                self._roi_frames += 1
+                self._counters["roi_hits"] += 1
+            else:
+                self._roi_frames = 0
+                self._counters["full_scans"] += 1
+
+    def _roi_missed(self):
+        with self._lock:
+            self._counters["roi_misses"] += 1
+
+    def detect(self, det_model, frame, full_size=None):
+        """
+        Full detection (boxes + keypoints) for the recognition path. `full_size`
+        overrides the detector input size for full-frame scans.
+        """
+        region = self._region(frame.shape)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            bboxes, kpss = det_model.detect(frame[y0:y1, x0:x1], input_size=self.det_size, max_num=0,
+                                            metric='default')
+            if bboxes.shape[0]:
+                bboxes = bboxes.copy()
+                bboxes[:, [0, 2]] += x0
+                bboxes[:, [1, 3]] += y0
+                if kpss is not None:
+                    kpss = kpss + np.array([x0, y0], dtype=kpss.dtype)
+                self._remember(bboxes[int(np.argmax(bboxes[:, 4]))], used_roi=True)
+                return bboxes, kpss
+            self._roi_missed()
+
+        bboxes, kpss = det_model.detect(frame, input_size=full_size, max_num=0, metric='default')
+        self._remember(bboxes[int(np.argmax(bboxes[:, 4]))] if bboxes.shape[0] else None, used_roi=False)
+        return bboxes, kpss
+
+    def detect_presence(self, det_model, frame, full_size=None):
+        """Presence fast path (no NMS, no per-face heads) with the same ROI policy."""
+        region = self._region(frame.shape)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            box = _first_face(det_model, frame[y0:y1, x0:x1], self.det_size)
+            if box is not None:
+                box[[0, 2]] += x0
+                box[[1, 3]] += y0
+                self._remember(box, used_roi=True)
+                return True
+            self._roi_missed()
+
+        box = _first_face(det_model, frame, full_size)
+        self._remember(box, used_roi=False)
+        return box is not None
+
+    def last_box(self):
+        with self._lock:
+            return None if self._last_box is None else self._last_box.copy()
+
+    def reset(self):
+        with self._lock:
+            self._last_box = None
+            self._roi_frames = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
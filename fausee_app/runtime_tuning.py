@@ -0,0 +1,104 @@
+import os
+import sys
+
+import cv2
+import onnxruntime
+
+# ORT intra-op pool size per session; 0 lets ORT use one thread per physical core,
+# which oversubscribes a 4-core laptop once OpenCV, Flask and Tk threads join in.
+ORT_INTRA_OP_THREADS = 2
+ORT_INTER_OP_THREADS = 1
+ORT_EXECUTION_MODE = "sequential"  # "sequential" | "parallel"
+ORT_GRAPH_OPTIMIZATION = "all"  # "disable" | "basic" | "extended" | "all"
+# Idle ORT workers spin-wait by default; that burns CPU between our sparse samples.
+ORT_ALLOW_SPINNING = False
+CV2_NUM_THREADS = 1
+# CPU indices to pin the process to, e.g. [2, 3]; None leaves scheduling to the OS.
+CPU_AFFINITY = None
+
+EXECUTION_MODES = {
+    "sequential": onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": onnxruntime.ExecutionMode.ORT_PARALLEL,
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def build_session_options(intra_op_threads=ORT_INTRA_OP_THREADS, inter_op_threads=ORT_INTER_OP_THREADS,
+                          execution_mode=ORT_EXECUTION_MODE, graph_optimization=ORT_GRAPH_OPTIMIZATION,
+                          allow_spinning=ORT_ALLOW_SPINNING):
+    """SessionOptions shared by every model session we create."""
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.execution_mode = EXECUTION_MODES[execution_mode]
+    options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[graph_optimization]
+    options.add_session_config_entry("session.intra_op.allow_spinning", "1" if allow_spinning else "0")
+    options.add_session_config_entry("session.inter_op.allow_spinning", "1" if allow_spinning else "0")
+    return options
+
+
+def _set_cpu_affinity(cpus):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cpus))
+    elif sys.platform == "win32":
+        import win32api
+        import win32process
+        mask = 0
+        for cpu in cpus:
+            mask |= 1 << cpu
+        win32process.SetProcessAffinityMask(win32api.GetCurrentProcess(), mask)
+    else:
+        raise OSError("CPU affinity is not supported on this platform.")
+
+
+def _get_cpu_affinity():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    if sys.platform == "win32":
+        import win32api
+        import win32process
+        process_mask, _ = win32process.GetProcessAffinityMask(win32api.GetCurrentProcess())
+        return [cpu for cpu in range(os.cpu_count() or 1) if process_mask & (1 << cpu)]
+    return None
+
+
+def apply_process_tuning(logger_manager, cv2_threads=CV2_NUM_THREADS, cpu_affinity=CPU_AFFINITY):
+    """Process-wide knobs: OpenCV's thread pool and CPU pinning."""
+    cv2.setNumThreads(cv2_threads)
+    if cpu_affinity:
+        try:
+            _set_cpu_affinity(cpu_affinity)
+        except Exception as e:
+            logger_manager.log_event(f"Failed to set CPU affinity {cpu_affinity}: {e}", level="warning")
+
+
+def report_runtime_settings(logger_manager, session_options=None, process="main"):
+    """
+    Log the settings actually in effect in this process, as read back from the
+    libraries. The inference worker calls this itself, so its affinity and
+    thread counts are reported rather than the parent's.
+    """
+    options = session_options or build_session_options()
+    try:
+        affinity = _get_cpu_affinity()
+    except Exception:
+        affinity = None
+    report = (
+        f"Runtime settings ({process} process, pid {os.getpid()}): onnxruntime {onnxruntime.__version__} "
+        f"providers={onnxruntime.get_available_providers()} "
+        f"intra_op_threads={options.intra_op_num_threads} "
+        f"inter_op_threads={options.inter_op_num_threads} "
+        f"execution_mode={options.execution_mode.name} "
+        f"graph_optimization={options.graph_optimization_level.name} "
+        f"allow_spinning={ORT_ALLOW_SPINNING} "
+        f"cv2_threads={cv2.getNumThreads()} "
+        f"cpu_count={os.cpu_count()} cpu_affinity={affinity}"
+    )
+    logger_manager.log_event(report)
+    return report
@@ -0,0 +1,91 @@
+import threading
+
+# Interval after the first success; grows while the user stays confidently verified.
+SCHED_BASE_INTERVAL = 5.0
+SCHED_MAX_INTERVAL = 15.0
+SCHED_GROWTH = 1.5
+# Similarity margin above SIMILARITY_THRESHOLD that counts as a confident match.
+SCHED_CONFIDENT_MARGIN = 0.15
+# During a miss streak, never resample faster than this...
+SCHED_MIN_INTERVAL = 0.05
+# ...and keep inference below this fraction of one core.
+SCHED_MAX_DUTY_CYCLE = 0.5
+# EMA weight of the newest inference cost sample.
+SCHED_COST_SMOOTHING = 0.2
+
+
+class AdaptiveScheduler:
+    """
+    Decides how long the watch loop waits before the next sample.
+
+    After a success the wait starts at `base_interval` and grows geometrically up
+    to `max_interval` while matches stay confident; a weak match drops it back to
+    the base. After a miss the loop resamples quickly, but the wait is stretched
+    so that inference uses at most `max_duty_cycle` of a core given its measured
+    cost.
+    """
+
+    def __init__(self, base_interval=SCHED_BASE_INTERVAL, max_interval=SCHED_MAX_INTERVAL,
+                 growth=SCHED_GROWTH, confident_margin=SCHED_CONFIDENT_MARGIN,
+                 min_interval=SCHED_MIN_INTERVAL, max_duty_cycle=SCHED_MAX_DUTY_CYCLE,
+                 cost_smoothing=SCHED_COST_SMOOTHING):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.growth = growth
+        self.confident_margin = confident_margin
+        self.min_interval = min_interval
+        self.max_duty_cycle = max_duty_cycle
+        self.cost_smoothing = cost_smoothing
+
+        self._lock = threading.Lock()
+        self._interval = base_interval
+        self._last_found = True
+        self._success_streak = 0
+        self._cost = None
+
+    def record(self, found, cost_seconds=None, margin=None):
+        """
+        Feed one sample outcome. `cost_seconds` is the inference time (None when
+        inference was skipped); `margin` is similarity minus threshold, if known.
+        """
+        with self._lock:
+            if cost_seconds is not None:
+                if self._cost is None:
+                    self._cost = cost_seconds
+                else:
+                    self._cost += self.cost_smoothing * (cost_seconds - self._cost)
+
+            self._last_found = found
+            if not found:
+                self._success_streak = 0
+                self._interval = self.base_interval
+                return
+
+            self._success_streak += 1
+            confident = margin is None or margin >= self.confident_margin
+            if self._success_streak > 1 and confident:
+                self._interval = min(self.max_interval, self._interval * self.growth)
+            else:
+                self._interval = self.base_interval
+
+    def next_delay(self):
+        with self._lock:
+            if self._last_found:
+                return self._interval
+            cost = self._cost or 0.0
+            duty_delay = cost * (1.0 - self.max_duty_cycle) / self.max_duty_cycle
+            return max(self.min_interval, duty_delay)
+
+    def reset(self):
+        with self._lock:
+            self._interval = self.base_interval
+            self._last_found = True
+            self._success_streak = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval_seconds": self._interval,
+                "success_streak": self._success_streak,
+                "inference_cost_seconds": self._cost,
+            }
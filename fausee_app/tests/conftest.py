@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from fausee_app/ with flat imports; mirror that for the tests.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+import queue
+
+from alert_overlay import AlertOverlayService
+
+
+class Logger:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, message, level="info"):
+        self.events.append((level, message))
+
+
+class RecordingOverlay(AlertOverlayService):
+    """Replaces the Tk UI thread with one that records the requests it drains."""
+
+    def __init__(self, fail=False):
+        super().__init__(Logger())
+        self.fail = fail
+        self.received = queue.Queue()
+
+    def _run(self, requests):
+        if self.fail:
+            with self._lock:
+                self._failed = True
+            return
+        while True:
+            action, text = requests.get()
+            self.received.put((action, text))
+            if action == "stop":
+                return
+
+
+def drain(overlay, n):
+    return [overlay.received.get(timeout=2) for _ in range(n)]
+
+
+def test_hide_before_any_alert_starts_no_ui_thread():
+    overlay = RecordingOverlay()
+    overlay.hide()
+    assert overlay.stats()["ui_thread"] is False
+
+
+def test_repeated_requests_are_posted_once():
+    overlay = RecordingOverlay()
+    for _ in range(3):
+        overlay.show("Away")
+    overlay.hide()
+    overlay.hide()
+    overlay.show("Away")
+    assert drain(overlay, 3) == [("show", "Away"), ("hide", None), ("show", "Away")]
+    assert overlay.stats()["shown"] == 2 and overlay.is_visible()
+    overlay.stop()
+    assert drain(overlay, 1) == [("stop", None)]
+    assert not overlay.is_visible()
+
+
+def test_show_after_stop_starts_a_fresh_ui_thread():
+    overlay = RecordingOverlay()
+    overlay.show("Away")
+    overlay.stop()
+    drain(overlay, 2)
+    overlay.show("Away")
+    assert drain(overlay, 1) == [("show", "Away")]
+    overlay.stop()
+
+
+def test_unavailable_ui_turns_requests_into_no_ops():
+    overlay = RecordingOverlay(fail=True)
+    overlay.show("Away")
+    overlay._thread.join(timeout=2)
+    overlay.show("Other")
+    assert overlay.stats()["failed"] is True
+    assert overlay.stats()["shown"] == 1
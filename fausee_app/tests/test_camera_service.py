@@ -0,0 +1,70 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from camera_service import CameraCaptureService  # noqa: E402
+
+
+class Logger:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, message, level="info"):
+        self.events.append((level, message))
+
+
+class FakeCapture:
+    """Device that honours sizes up to `max_size` and only the FOURCCs in `fourccs`."""
+
+    def __init__(self, max_size=(1280, 960), fourccs=("MJPG", "YUY2"), default_size=(640, 480)):
+        self.max_size = max_size
+        self.fourccs = fourccs
+        self.props = {cv2.CAP_PROP_FRAME_WIDTH: default_size[0], cv2.CAP_PROP_FRAME_HEIGHT: default_size[1],
+                      cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*fourccs[-1]), cv2.CAP_PROP_FPS: 30}
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            value = min(value, self.max_size[0])
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            value = min(value, self.max_size[1])
+        elif prop == cv2.CAP_PROP_FOURCC:
+            name = "".join(chr((int(value) >> (8 * i)) & 0xFF) for i in range(4))
+            if name not in self.fourccs:
+                return False
+        self.props[prop] = value
+        return True
+
+    def get(self, prop):
+        return self.props[prop]
+
+
+def negotiate(capture, size=None):
+    camera = CameraCaptureService(Logger())
+    if size:
+        camera.request_frame_size(size)
+    camera._negotiate(capture)
+    return camera
+
+
+def test_negotiates_the_requested_size_with_the_first_accepted_fourcc():
+    camera = negotiate(FakeCapture(fourccs=("YUY2",)), (960, 720))
+    assert camera.negotiated_format["size"] == [960, 720]
+    assert camera.negotiated_format["fourcc"] == "YUY2"
+    assert camera.max_frame_size is None
+
+
+def test_records_the_largest_size_the_device_delivers():
+    camera = negotiate(FakeCapture(max_size=(640, 480)), (1280, 960))
+    assert camera.negotiated_format["size"] == [640, 480]
+    assert camera.max_frame_size == (640, 480)
+
+
+def test_size_request_triggers_renegotiation():
+    camera = CameraCaptureService(Logger())
+    capture = FakeCapture()
+    camera._negotiate(capture)
+    assert camera._negotiated_size == camera._requested_size
+    camera.request_frame_size((480, 360))
+    assert camera._requested_size != camera._negotiated_size
+    camera._negotiate(capture)
+    assert camera.negotiated_format["size"] == [480, 360]
@@ -0,0 +1,55 @@
+import pytest
+
+from decision_policy import (DECISION_ABSENT, DECISION_PRESENT, DECISION_UNDECIDED, EmaPolicy, SprtPolicy,
+                             create_policy)
+
+# Halfway between the present and absent means: carries no evidence either way.
+AMBIGUOUS = 0.5
+
+
+def test_sprt_locks_on_clear_misses_but_not_before_min_seconds():
+    policy = SprtPolicy(min_seconds=5, deadline_seconds=60)
+    assert [policy.observe(False, now=t) for t in (0, 1, 2, 3)] == [DECISION_UNDECIDED] * 4
+    assert policy.observe(False, now=5) == DECISION_ABSENT
+
+
+def test_sprt_confirms_presence_on_a_strong_match():
+    policy = SprtPolicy()
+    assert policy.observe(True, similarity=0.9, now=0) == DECISION_PRESENT
+
+
+def test_sprt_deadline_bounds_ambiguous_evidence():
+    policy = SprtPolicy(min_seconds=5, deadline_seconds=60)
+    assert policy.observe(False, similarity=AMBIGUOUS, now=0) == DECISION_UNDECIDED
+    assert policy.observe(False, similarity=AMBIGUOUS, now=59) == DECISION_UNDECIDED
+    assert policy.observe(False, similarity=AMBIGUOUS, now=60) == DECISION_ABSENT
+
+
+@pytest.mark.parametrize("policy", [SprtPolicy(min_seconds=5, deadline_seconds=60),
+                                    EmaPolicy(min_seconds=5, deadline_seconds=60, absent_level=2.0)])
+def test_found_frame_after_the_deadline_does_not_lock(policy):
+    policy.observe(False, similarity=AMBIGUOUS, now=0)
+    assert policy.observe(True, similarity=AMBIGUOUS, now=61) == DECISION_UNDECIDED
+    # The match ended the streak, so the next miss starts a new deadline.
+    assert policy.observe(False, similarity=AMBIGUOUS, now=62) == DECISION_UNDECIDED
+    assert policy.observe(False, similarity=AMBIGUOUS, now=122) == DECISION_ABSENT
+
+
+def test_ema_locks_after_sustained_misses_and_recovers():
+    policy = EmaPolicy(min_seconds=0, deadline_seconds=60)
+    outcomes = [policy.observe(False, now=t) for t in range(5)]
+    assert outcomes[:4] == [DECISION_UNDECIDED] * 4 and outcomes[4] == DECISION_ABSENT
+    outcomes = [policy.observe(True, now=5 + t) for t in range(6)]
+    assert DECISION_PRESENT in outcomes
+
+
+def test_ema_deadline_without_enough_evidence():
+    policy = EmaPolicy(min_seconds=0, deadline_seconds=10, absent_level=2.0)
+    assert policy.observe(False, now=0) == DECISION_UNDECIDED
+    assert policy.observe(False, now=10) == DECISION_ABSENT
+
+
+def test_create_policy():
+    assert isinstance(create_policy("ema", min_seconds=1), EmaPolicy)
+    with pytest.raises(ValueError):
+        create_policy("majority")
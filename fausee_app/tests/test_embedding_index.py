@@ -0,0 +1,71 @@
+import numpy as np
+
+from embedding_index import EmbeddingIndex, INDEX_MODE_IVF
+
+
+def clustered(n_clusters=50, per_cluster=40, dim=64, spread=0.15, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = np.repeat(centers, per_cluster, axis=0) + spread * rng.normal(size=(n_clusters * per_cluster, dim))
+    labels = [f"id{i}" for i in range(vectors.shape[0])]
+    return vectors.astype(np.float32), labels
+
+
+def recall_at_1(approx, exact):
+    return float(np.mean(approx[:, 0] == exact[:, 0]))
+
+
+def test_ivf_recall_against_exact_search():
+    vectors, labels = clustered()
+    exact = EmbeddingIndex(dim=64)
+    exact.build(vectors, labels)
+    ivf = EmbeddingIndex(dim=64, mode=INDEX_MODE_IVF, nlist=16, nprobe=4)
+    ivf.build(vectors, labels)
+    assert ivf.is_trained
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), 200, replace=False)] + 0.05 * rng.normal(size=(200, 64))
+    _, exact_labels = exact.search(queries, k=5)
+    _, ivf_labels = ivf.search(queries, k=5)
+    assert recall_at_1(ivf_labels, exact_labels) >= 0.95
+
+    # Probing every list is an exhaustive search.
+    _, all_lists = ivf.search(queries, k=5, nprobe=16)
+    assert np.array_equal(all_lists, exact_labels)
+
+
+def test_small_ivf_index_falls_back_to_exact_scan():
+    vectors, labels = clustered(n_clusters=2, per_cluster=5)
+    index = EmbeddingIndex(dim=64, mode=INDEX_MODE_IVF, nlist=16)
+    index.build(vectors, labels)
+    assert not index.is_trained
+    _, found = index.search(vectors[:3], k=1)
+    assert list(found[:, 0]) == labels[:3]
+
+
+def test_add_retrains_after_the_index_doubles():
+    vectors, labels = clustered()
+    index = EmbeddingIndex(dim=64, mode=INDEX_MODE_IVF, nlist=8)
+    index.build(vectors[:500], labels[:500])
+    centroids = index._centroids
+    index.add(vectors[500:900], labels[500:900])
+    assert index._centroids is centroids
+    index.add(vectors[900:1100], labels[900:1100])
+    assert index._centroids is not centroids
+    _, found = index.search(vectors[1050:1051], k=1, nprobe=8)
+    assert found[0, 0] == labels[1050]
+
+
+def test_remove_and_save_load_round_trip(tmp_path):
+    vectors, labels = clustered()
+    index = EmbeddingIndex(dim=64, mode=INDEX_MODE_IVF, nlist=16, nprobe=16)
+    index.build(vectors, labels)
+    assert index.remove(["id0", "id1"]) == 2
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = EmbeddingIndex.load(path)
+    assert len(loaded) == len(vectors) - 2 and loaded.is_trained
+    _, found = loaded.search(vectors[:3], k=1)
+    assert "id0" not in found and "id1" not in found
+    assert found[2, 0] == "id2"
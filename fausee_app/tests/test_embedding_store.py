@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, image_digest
+
+
+def make_store(tmp_path, signature="pack-a"):
+    return EmbeddingStore(str(tmp_path / "embeddings"), lambda: signature)
+
+
+def test_round_trip_and_content_addressing(tmp_path):
+    store = make_store(tmp_path)
+    digest = image_digest(b"photo-1")
+    store.put(digest, np.ones(4))
+    assert np.array_equal(store.get(digest), np.ones(4, dtype=np.float32))
+    assert store.get(image_digest(b"photo-2")) is None
+
+
+def test_model_change_invalidates_entries(tmp_path):
+    digest = image_digest(b"photo")
+    make_store(tmp_path, "pack-a").put(digest, np.ones(4))
+    other = make_store(tmp_path, "pack-b")
+    assert other.get(digest) is None
+    assert other.prune() == 1
+    assert os.listdir(tmp_path / "embeddings") == []
+
+
+def test_prune_drops_missing_and_replaced_images(tmp_path):
+    store = make_store(tmp_path)
+    photo = tmp_path / "user_1.jpg"
+    photo.write_bytes(b"old")
+    store.put(image_digest(b"old"), np.ones(4), str(photo))
+    photo.write_bytes(b"new")
+    store.put(image_digest(b"new"), np.zeros(4), str(photo))
+    gone = tmp_path / "user_2.jpg"
+    store.put(image_digest(b"gone"), np.ones(4), str(gone))
+
+    assert store.prune() == 2
+    assert store.get(image_digest(b"new")) is not None
+    assert store.get(image_digest(b"old")) is None
+    assert store.prune() == 0
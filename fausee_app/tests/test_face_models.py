@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("insightface")
+
+from face_models import FaceModels, RECOGNITION_CROP_SIZE, align_crops  # noqa: E402
+from insightface.utils.face_align import arcface_dst  # noqa: E402
+
+
+class Logger:
+    def log_event(self, message, level="info"):
+        pass
+
+
+class FakeRecognizer:
+    """Embeds a crop as its per-channel means; records the batch size of each call."""
+
+    output_shape = [None, 3]
+
+    def __init__(self, batch_dim):
+        self.input_shape = [batch_dim, 3, RECOGNITION_CROP_SIZE, RECOGNITION_CROP_SIZE]
+        self.batches = []
+
+    def get_feat(self, imgs):
+        imgs = imgs if isinstance(imgs, list) else [imgs]
+        self.batches.append(len(imgs))
+        return np.stack([img.reshape(-1, 3).mean(axis=0) for img in imgs]).astype(np.float32)
+
+
+def models_with(recognizer):
+    models = FaceModels(Logger())
+    models._models["recognition"] = recognizer
+    return models
+
+
+def crops(n):
+    return [np.full((RECOGNITION_CROP_SIZE, RECOGNITION_CROP_SIZE, 3), (i + 1, 2, 3), dtype=np.uint8)
+            for i in range(n)]
+
+
+def test_dynamic_batch_head_embeds_all_crops_in_one_run():
+    recognizer = FakeRecognizer("None")
+    embeddings = models_with(recognizer).embed_crops(crops(4))
+    assert recognizer.batches == [4]
+    assert embeddings.shape == (4, 3)
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+
+
+def test_fixed_batch_head_runs_crop_by_crop():
+    recognizer = FakeRecognizer(1)
+    batched = models_with(FakeRecognizer("None")).embed_crops(crops(3))
+    embeddings = models_with(recognizer).embed_crops(crops(3))
+    assert recognizer.batches == [1, 1, 1]
+    assert np.allclose(embeddings, batched)
+
+
+def test_no_crops_gives_an_empty_matrix():
+    assert models_with(FakeRecognizer("None")).embed_crops([]).shape == (0, 3)
+
+
+def test_align_crops_returns_one_crop_per_face():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    kpss = np.stack([arcface_dst + offset for offset in (0.0, 200.0)])
+    aligned = align_crops(frame, kpss)
+    assert [crop.shape for crop in aligned] == [(RECOGNITION_CROP_SIZE, RECOGNITION_CROP_SIZE, 3)] * 2
@@ -0,0 +1,43 @@
+import numpy as np
+
+from face_tracker import FaceTracker, TRACK_MAX_GAP_SECONDS
+from sampling_scheduler import SCHED_MAX_INTERVAL
+
+BOX = np.array([100.0, 100.0, 200.0, 220.0])
+
+
+def test_same_face_keeps_its_track_and_verification():
+    tracker = FaceTracker(recheck_seconds=60, max_gap_seconds=10)
+    track, = tracker.update([BOX], now=0.0)
+    tracker.mark_verified(track, 0.8, now=0.0)
+    moved, = tracker.update([BOX + 5], now=5.0)
+    assert moved is track
+    assert tracker.is_verified(moved, now=5.0)
+
+
+def test_verification_expires_after_recheck_interval():
+    tracker = FaceTracker(recheck_seconds=60, max_gap_seconds=100)
+    track, = tracker.update([BOX], now=0.0)
+    tracker.mark_verified(track, 0.8, now=0.0)
+    track, = tracker.update([BOX], now=61.0)
+    assert not tracker.is_verified(track, now=61.0)
+
+
+def test_track_is_dropped_after_a_long_gap():
+    tracker = FaceTracker(max_gap_seconds=10)
+    track, = tracker.update([BOX], now=0.0)
+    tracker.mark_verified(track, 0.8, now=0.0)
+    later, = tracker.update([BOX], now=11.0)
+    assert later is not track
+    assert not tracker.is_verified(later, now=11.0)
+
+
+def test_distant_box_starts_a_new_track():
+    tracker = FaceTracker()
+    first, = tracker.update([BOX], now=0.0)
+    other, = tracker.update([BOX + 400], now=1.0)
+    assert other is not first
+
+
+def test_gap_outlasts_the_longest_sampling_interval():
+    assert TRACK_MAX_GAP_SECONDS > SCHED_MAX_INTERVAL
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from frame_gate import FrameGate, GATE_INFER, GATE_UNCHANGED, GATE_UNUSABLE  # noqa: E402
+
+
+def textured_frame(seed=0, brightness=120):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 40, (480, 640, 3))
+    return np.clip(brightness + noise, 0, 255).astype(np.uint8)
+
+
+def test_dark_frame_is_unusable():
+    gate = FrameGate()
+    assert gate.check(np.full((480, 640, 3), 5, dtype=np.uint8)) == GATE_UNUSABLE
+
+
+def test_flat_frame_is_too_blurred():
+    gate = FrameGate()
+    assert gate.check(np.full((480, 640, 3), 120, dtype=np.uint8)) == GATE_UNUSABLE
+
+
+def test_unchanged_scene_is_skipped_only_after_verification():
+    gate = FrameGate()
+    frame = textured_frame()
+    assert gate.check(frame) == GATE_INFER
+    assert gate.check(frame) == GATE_INFER  # nothing verified yet
+    gate.mark_verified()
+    assert gate.check(frame) == GATE_UNCHANGED
+    assert gate.check(textured_frame(seed=1, brightness=80)) == GATE_INFER
+
+
+def test_verification_expires():
+    gate = FrameGate(max_reuse_seconds=0)
+    frame = textured_frame()
+    gate.check(frame)
+    gate.mark_verified()
+    gate._verified_at -= 1.0
+    assert gate.check(frame) == GATE_INFER
+
+
+def test_reset_forgets_verification():
+    gate = FrameGate()
+    frame = textured_frame()
+    gate.check(frame)
+    gate.mark_verified()
+    gate.reset()
+    assert gate.check(frame) == GATE_INFER
+    stats = gate.stats()
+    assert stats["frames"] == 2 and stats["inferences_saved"] == 0
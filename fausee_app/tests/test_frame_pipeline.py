@@ -0,0 +1,32 @@
+import threading
+
+from frame_pipeline import LatestQueue
+
+
+def test_full_queue_drops_the_oldest_item():
+    queue = LatestQueue(2)
+    for item in (1, 2, 3):
+        queue.put(item)
+    assert queue.get(timeout=0) == 2
+    assert queue.get(timeout=0) == 3
+    assert queue.stats() == {"depth": 0, "put": 3, "dropped": 1}
+
+
+def test_get_times_out_on_empty_queue():
+    assert LatestQueue(1).get(timeout=0.01) is None
+
+
+def test_get_wakes_up_on_put():
+    queue = LatestQueue(1)
+    timer = threading.Timer(0.05, queue.put, args=("frame",))
+    timer.start()
+    assert queue.get(timeout=5) == "frame"
+    timer.join()
+
+
+def test_clear_counts_stale_items():
+    queue = LatestQueue(3)
+    queue.put(1)
+    queue.put(2)
+    queue.clear()
+    assert queue.depth() == 0 and queue.drop_count == 2
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+import cv2  # noqa: E402
+from frame_sources import (ImageDirectorySource, SyntheticSource, VideoFileSource, _PacedSource,  # noqa: E402
+                           create_frame_source)
+from metrics import MetricsRegistry  # noqa: E402
+
+
+class Logger:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, message, level="info"):
+        self.events.append((level, message))
+
+
+class ListSource(_PacedSource):
+    """Paced source over an in-memory list of frames."""
+
+    def __init__(self, frames, **kwargs):
+        super().__init__(Logger(), **kwargs)
+        self.frames = frames
+        self._index = 0
+
+    def _rewind(self):
+        self._index = 0
+        return True
+
+    def _next_frame(self):
+        if self._index >= len(self.frames):
+            return None
+        self._index += 1
+        return self.frames[self._index - 1]
+
+
+def frames(n, size=(64, 48)):
+    return [np.full((size[1], size[0], 3), i, dtype=np.uint8) for i in range(n)]
+
+
+def read_all(source, limit=50, timeout=0.5):
+    seen = []
+    seq = 0
+    source.acquire()
+    try:
+        for _ in range(limit):
+            seq, frame = source.get_frame(newer_than=seq, timeout=timeout, max_age=None)
+            if frame is None:
+                break
+            seen.append(int(frame[0, 0, 0]))
+    finally:
+        source.release()
+    return seen
+
+
+def test_capture_stage_is_timed_on_the_source_thread():
+    metrics = MetricsRegistry()
+    read_all(ListSource(frames(3), metrics=metrics))
+    assert metrics.to_json()["histograms"]["stage"]["capture"]["count"] == 3
+
+
+def test_directory_is_served_in_name_order_and_then_exhausted(tmp_path):
+    for name, value in (("b.png", 2), ("a.jpg", 1), ("c.bmp", 3)):
+        cv2.imwrite(str(tmp_path / name), np.full((24, 32, 3), value, dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("not an image")
+    (tmp_path / "broken.png").write_bytes(b"not a png")
+
+    source = ImageDirectorySource(Logger(), str(tmp_path))
+    assert read_all(source) == [1, 2, 3]
+    assert source.exhausted
+    assert any("reached its end" in message for _, message in source.logger.events)
+
+
+def test_reacquiring_an_exhausted_source_starts_over(tmp_path):
+    source = ListSource(frames(2))
+    assert read_all(source) == [0, 1]
+    assert source.exhausted
+    assert read_all(source) == [0, 1]
+
+
+def test_looping_source_rewinds_instead_of_ending():
+    source = ListSource(frames(2), loop=True)
+    assert read_all(source, limit=5) == [0, 1, 0, 1, 0]
+    assert not source.exhausted
+
+
+def test_empty_directory_is_exhausted_immediately(tmp_path):
+    source = ImageDirectorySource(Logger(), str(tmp_path))
+    assert read_all(source) == []
+    assert source.exhausted
+
+
+def test_video_file_is_replayed_frame_by_frame(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("no MJPG encoder in this OpenCV build")
+    for frame in frames(4):
+        writer.write(frame)
+    writer.release()
+
+    source = VideoFileSource(Logger(), path, realtime=False)
+    assert len(read_all(source)) == 4
+    assert source.exhausted and source.max_frame_size == (64, 48)
+
+
+def test_synthetic_source_is_deterministic():
+    def first_frames():
+        source = SyntheticSource(Logger(), size=(64, 48), fps=None)
+        seen = []
+        seq = 0
+        source.acquire()
+        try:
+            for _ in range(3):
+                seq, frame = source.get_frame(newer_than=seq, timeout=1.0, max_age=None)
+                seen.append(frame.copy())
+        finally:
+            source.release()
+        return seen
+
+    assert all(np.array_equal(a, b) for a, b in zip(first_frames(), first_frames()))
+
+
+def test_create_frame_source_parses_specs(tmp_path):
+    assert isinstance(create_frame_source(Logger(), f"images:{tmp_path}"), ImageDirectorySource)
+    video = create_frame_source(Logger(), "video-fast:clip.avi")
+    assert isinstance(video, VideoFileSource) and not video.realtime
+    with pytest.raises(ValueError):
+        create_frame_source(Logger(), "webcam")
@@ -0,0 +1,45 @@
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("insightface")
+
+from inference_worker import SharedFrameRing, _ChannelLogger  # noqa: E402
+
+
+def test_channel_logger_keeps_concurrent_messages_whole():
+    parent, child = multiprocessing.Pipe()
+    logger = _ChannelLogger(child)
+    payload = "x" * 50000  # larger than a pipe buffer, so unguarded sends would interleave
+
+    def log_many(n):
+        for i in range(20):
+            logger.log_event(f"{n}:{i}:{payload}")
+
+    threads = [threading.Thread(target=log_many, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    received = [parent.recv() for _ in range(80)]
+    for thread in threads:
+        thread.join()
+    assert all(kind == "log" and message.endswith(payload) for kind, message, _ in received)
+    assert len({tuple(message.split(":", 2)[:2]) for _, message, _ in received}) == 80
+
+
+def test_frame_ring_round_trips_frames_through_shared_memory():
+    ring = SharedFrameRing(slots=2, slot_bytes=64 * 48 * 3)
+    try:
+        reader = SharedFrameRing(slots=2, slot_bytes=64 * 48 * 3, name=ring.name)
+        frames = [np.full((48, 64, 3), value, dtype=np.uint8) for value in (1, 2, 3)]
+        slots = [ring.write(frame) for frame in frames]
+        assert slots == [0, 1, 0]  # round-robin
+        assert np.array_equal(reader.view(0, (48, 64, 3)), frames[2])
+        assert np.array_equal(reader.view(1, (48, 64, 3)), frames[1])
+        assert ring.fits(frames[0])
+        assert not ring.fits(np.zeros((49, 64, 3), dtype=np.uint8))
+        assert not ring.fits(np.zeros((48, 64, 3), dtype=np.float32))
+        reader.close()
+    finally:
+        ring.close(unlink=True)
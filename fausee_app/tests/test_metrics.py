@@ -0,0 +1,37 @@
+from metrics import Histogram, MetricsRegistry
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry()
+    registry.observe_stage("detect", 0.004)
+    registry.observe_stage("detect", 0.03)
+    registry.observe("time_to_decision", "absent", 7.0)
+    registry.inc("frames_captured", 3)
+    text = registry.to_prometheus()
+
+    assert "# TYPE fausee_stage_seconds histogram" in text
+    assert 'fausee_stage_seconds_bucket{stage="detect",le="0.005"} 1' in text
+    assert 'fausee_stage_seconds_bucket{stage="detect",le="+Inf"} 2' in text
+    assert 'fausee_stage_seconds_count{stage="detect"} 2' in text
+    assert 'fausee_time_to_decision_seconds_bucket{outcome="absent",le="10.0"} 1' in text
+    assert "fausee_frames_captured_total 3" in text
+    assert "fausee_frames_captured_per_second " in text
+    assert text.endswith("\n")
+
+
+def test_json_summary_and_timer():
+    registry = MetricsRegistry()
+    with registry.timer("embed"):
+        pass
+    data = registry.to_json()
+    embed = data["histograms"]["stage"]["embed"]
+    assert embed["count"] == 1 and embed["buckets"]["+Inf"] == 1
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    hist = Histogram((1.0, 2.0, 4.0))
+    assert hist.quantile(0.5) is None
+    for value in (1.5, 1.5, 3.0, 3.0):
+        hist.observe(value)
+    assert hist.quantile(0.5) == 2.0
+    assert 2.0 < hist.quantile(0.75) <= 4.0
@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("insightface")
+
+import model_selection  # noqa: E402
+from model_selection import ModelPackSelector  # noqa: E402
+
+
+class Logger:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, message, level="info"):
+        self.events.append((level, message))
+
+
+@pytest.fixture
+def timings(monkeypatch):
+    """Per-pack benchmark results in ms; a missing pack fails to load."""
+    results = {}
+    calls = []
+
+    def fake_benchmark(logger_manager, pack, det_size):
+        calls.append(pack)
+        if pack not in results:
+            raise RuntimeError("model files missing")
+        return results[pack]
+
+    monkeypatch.setattr(model_selection, "benchmark_pack", fake_benchmark)
+    return results, calls
+
+
+def selector(tmp_path, budget_ms=100):
+    return ModelPackSelector(Logger(), str(tmp_path / "selection.json"), candidates=["l", "m", "s"],
+                             budget_ms=budget_ms, det_size=(320, 320))
+
+
+def test_picks_the_most_accurate_pack_within_budget(tmp_path, timings):
+    results, calls = timings
+    results.update({"l": 180.0, "m": 90.0, "s": 40.0})
+    assert selector(tmp_path).choose() == "m"
+    assert calls == ["l", "m"]  # stops at the first pack that fits
+
+
+def test_falls_back_to_the_fastest_pack_when_none_fits(tmp_path, timings):
+    results, _ = timings
+    results.update({"l": 400.0, "s": 150.0})  # "m" cannot be loaded
+    assert selector(tmp_path).choose() == "s"
+
+
+def test_saved_choice_is_reused_until_the_budget_changes(tmp_path, timings):
+    results, calls = timings
+    results.update({"l": 180.0, "m": 90.0, "s": 40.0})
+    selector(tmp_path).choose()
+    calls.clear()
+    assert selector(tmp_path).choose() == "m" and calls == []
+    assert selector(tmp_path, budget_ms=200).choose() == "l" and calls == ["l"]
+
+
+def test_raises_when_no_pack_loads(tmp_path, timings):
+    with pytest.raises(RuntimeError):
+        selector(tmp_path).choose()
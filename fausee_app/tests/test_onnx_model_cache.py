@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from onnx_model_cache import MODEL_HASHES_FILE, _remove_stale, model_digest, optimized_model_path  # noqa: E402
+
+
+def test_digest_is_memoised_and_follows_content(tmp_path):
+    model = tmp_path / "det_10g.onnx"
+    model.write_bytes(b"weights-a")
+    first = model_digest(str(model), str(tmp_path))
+    memo = json.loads((tmp_path / MODEL_HASHES_FILE).read_text())
+    assert memo[str(model)]["sha256"] == first
+
+    # Same size, new content: the mtime changes, so the file is hashed again.
+    model.write_bytes(b"weights-b")
+    stat = os.stat(model)
+    os.utime(model, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert model_digest(str(model), str(tmp_path)) != first
+
+
+def test_cache_key_changes_with_providers_and_optimization(tmp_path):
+    model = tmp_path / "det_10g.onnx"
+    model.write_bytes(b"weights")
+    base = optimized_model_path(str(model), str(tmp_path), ["CPUExecutionProvider"], "all")
+    assert base == optimized_model_path(str(model), str(tmp_path), ["CPUExecutionProvider"], "all")
+    assert base != optimized_model_path(str(model), str(tmp_path), ["CPUExecutionProvider"], "basic")
+    assert base != optimized_model_path(str(model), str(tmp_path), ["CUDAExecutionProvider"], "all")
+    assert os.path.basename(base).startswith("det_10g.")
+
+
+def test_remove_stale_keeps_other_models_and_foreign_files(tmp_path):
+    current = tmp_path / "det_10g.0123456789abcdef0123.onnx"
+    stale = tmp_path / "det_10g.aaaaaaaaaaaaaaaaaaaa.onnx"
+    other_model = tmp_path / "w600k_r50.bbbbbbbbbbbbbbbbbbbb.onnx"
+    foreign = tmp_path / "det_10g.notes.onnx"
+    for path in (current, stale, other_model, foreign):
+        path.write_bytes(b"")
+    _remove_stale(str(current))
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([current.name, other_model.name, foreign.name])
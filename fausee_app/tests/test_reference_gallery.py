@@ -0,0 +1,25 @@
+import numpy as np
+
+from reference_gallery import ReferenceGallery
+
+
+def test_best_match_scores_every_face_against_every_enrollment():
+    gallery = ReferenceGallery(np.eye(4)[:2])
+    faces = np.array([[0.0, 0.0, 1.0, 0.0], [0.0, 1.0, 0.0, 0.0]])
+    similarity, best = gallery.best_match(faces)
+    assert best == 1 and np.isclose(similarity, 1.0)
+
+
+def test_swap_none_clears_and_bumps_version():
+    gallery = ReferenceGallery(np.eye(4)[:1])
+    version = gallery.version
+    gallery.swap(None)
+    assert gallery.snapshot() is None and gallery.version == version + 1
+    assert gallery.best_match(np.eye(4)[:1]) == (None, None)
+
+
+def test_add_does_not_mutate_published_snapshot():
+    gallery = ReferenceGallery(np.eye(4)[:1])
+    snapshot = gallery.snapshot()
+    gallery.add(np.eye(4)[1])
+    assert snapshot.shape[0] == 1 and gallery.size() == 2
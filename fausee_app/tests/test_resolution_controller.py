@@ -0,0 +1,48 @@
+from resolution_controller import ResolutionController, level_for_det_size
+
+
+def test_steps_down_after_hysteresis_when_over_budget():
+    controller = ResolutionController(start_level=2, budget_ms=120, hysteresis=5)
+    changes = [controller.record(200) for _ in range(5)]
+    assert changes == [False] * 4 + [True]
+    assert controller.level == 1
+    assert controller.det_size == (256, 256)
+
+
+def test_small_face_vetoes_stepping_down():
+    controller = ResolutionController(start_level=2, budget_ms=120, hysteresis=5)
+    for _ in range(10):
+        assert not controller.record(200, face_height=60)
+    assert controller.level == 2
+
+
+def test_climbs_back_with_headroom():
+    controller = ResolutionController(start_level=2, budget_ms=120, hysteresis=2)
+    controller.record(200)
+    controller.record(200)
+    assert controller.level == 1
+    for _ in range(20):
+        controller.record(10)
+    assert controller.level == 2
+
+
+def test_fixed_mode_never_changes():
+    controller = ResolutionController(adaptive=False, start_level=2)
+    assert not any(controller.record(500) for _ in range(20))
+    assert controller.det_sizes() == [controller.det_size]
+    assert len(ResolutionController(start_level=2, min_level=1, max_level=3).det_sizes()) == 3
+
+
+def test_start_level_follows_the_detector_size():
+    assert level_for_det_size((320, 320)) == 2
+    assert level_for_det_size((640, 640)) == 4
+    assert level_for_det_size((300, 300)) == 2
+
+
+def test_source_limit_caps_the_levels_instead_of_upscaling():
+    controller = ResolutionController(start_level=3)
+    assert controller.limit_frame_size((640, 480))
+    assert controller.level == 2 and controller.frame_size == (640, 480)
+    assert not controller.limit_frame_size((640, 480))
+    assert not controller.limit_frame_size(None)
+    assert controller.det_sizes()[-1] == (320, 320)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from roi_detector import RoiDetector  # noqa: E402
+
+
+class BrightSquareDetector:
+    """Reports the bounding box of the non-zero pixels as the only face."""
+
+    def __init__(self):
+        self.calls = []
+
+    def detect(self, img, input_size=None, max_num=0, metric='default'):
+        self.calls.append((img.shape[:2], input_size))
+        ys, xs = np.nonzero(img[:, :, 0])
+        if xs.size == 0:
+            return np.zeros((0, 5), dtype=np.float32), None
+        box = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9]], dtype=np.float32)
+        kps = np.tile(box[:, None, :2], (1, 5, 1))
+        return box, kps
+
+
+def frame_with_face(x, y, size=40):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+def test_second_frame_scans_only_the_region_and_returns_frame_coordinates():
+    detector = RoiDetector(det_size=(160, 160), refresh_frames=20)
+    model = BrightSquareDetector()
+    detector.detect(model, frame_with_face(300, 200), full_size=(320, 320))
+    bboxes, kpss = detector.detect(model, frame_with_face(310, 205), full_size=(320, 320))
+
+    assert model.calls[0] == ((480, 640), (320, 320))
+    assert model.calls[1][1] == (160, 160) and model.calls[1][0] < (480, 640)
+    assert list(bboxes[0, :4]) == [310, 205, 350, 245]
+    assert list(kpss[0, 0]) == [310, 205]
+    assert detector.stats() == {"roi_hits": 1, "roi_misses": 0, "full_scans": 1}
+
+
+def test_miss_in_region_falls_back_to_a_full_scan():
+    detector = RoiDetector()
+    model = BrightSquareDetector()
+    detector.detect(model, frame_with_face(300, 200))
+    bboxes, _ = detector.detect(model, frame_with_face(20, 20))
+    assert list(bboxes[0, :4]) == [20, 20, 60, 60]
+    assert detector.stats()["roi_misses"] == 1
+
+
+def test_full_scan_is_forced_every_refresh_frames():
+    detector = RoiDetector(refresh_frames=2)
+    model = BrightSquareDetector()
+    for _ in range(4):
+        detector.detect(model, frame_with_face(300, 200))
+    assert detector.stats() == {"roi_hits": 2, "roi_misses": 0, "full_scans": 2}
+
+
+def test_disabled_always_scans_the_full_frame():
+    detector = RoiDetector(enabled=False)
+    model = BrightSquareDetector()
+    for _ in range(3):
+        detector.detect(model, frame_with_face(300, 200))
+    assert all(shape == (480, 640) for shape, _ in model.calls)
@@ -0,0 +1,29 @@
+from sampling_scheduler import AdaptiveScheduler
+
+
+def test_interval_grows_while_confident_and_is_capped():
+    scheduler = AdaptiveScheduler(base_interval=5, max_interval=15, growth=1.5, confident_margin=0.1)
+    delays = []
+    for _ in range(6):
+        scheduler.record(True, 0.05, margin=0.3)
+        delays.append(scheduler.next_delay())
+    assert delays[0] == 5
+    assert delays == sorted(delays)
+    assert delays[-1] == 15
+
+
+def test_weak_match_drops_back_to_base():
+    scheduler = AdaptiveScheduler(base_interval=5, max_interval=15, confident_margin=0.1)
+    for _ in range(4):
+        scheduler.record(True, 0.05, margin=0.3)
+    scheduler.record(True, 0.05, margin=0.01)
+    assert scheduler.next_delay() == 5
+
+
+def test_miss_resamples_within_duty_cycle():
+    scheduler = AdaptiveScheduler(min_interval=0.05, max_duty_cycle=0.5)
+    scheduler.record(False, 0.2)
+    assert scheduler.next_delay() == 0.2  # inference 0.2 s + wait 0.2 s -> 50% duty
+    scheduler = AdaptiveScheduler(min_interval=0.05, max_duty_cycle=0.5)
+    scheduler.record(False, 0.01)
+    assert scheduler.next_delay() == 0.05